@@ -0,0 +1,104 @@
+"""Streaming accumulators of statistics, which use constant memory.
+
+Accumulators can be merged, to combine the statistics of separate runs, and
+snapshotted, to report intermediate results while still adding values."""
+
+
+import abc
+import copy
+import math
+
+
+class Accumulator(abc.ABC):
+    """Base class for accumulators."""
+
+    @abc.abstractmethod
+    def add(self, *args):
+        """Add a value."""
+
+    @abc.abstractmethod
+    def merge(self, other):
+        """Add the values accumulated by another accumulator of the same kind."""
+
+    def snapshot(self):
+        """Return an independent copy of the current state."""
+        return copy.deepcopy(self)
+
+
+class Moments(Accumulator):
+    """Count, mean and variance of numbers, using Welford's algorithm."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.sum_of_squares = 0.0
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.sum_of_squares += delta * (value - self.mean)
+
+    def merge(self, other):
+        # See Chan et al., "Algorithms for computing the sample variance".
+        count = self.count + other.count
+        if not count:
+            return
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.sum_of_squares += (
+            other.sum_of_squares + delta * delta * self.count * other.count / count
+        )
+        self.count = count
+
+    def variance(self):
+        """Return the sample variance."""
+        if self.count < 2:
+            return math.nan
+        return self.sum_of_squares / (self.count - 1)
+
+    def standard_error(self):
+        """Return the standard error of the mean."""
+        return math.sqrt(self.variance() / self.count)
+
+
+class Sums(Accumulator):
+    """Element-wise sums of vectors of the same size."""
+
+    def __init__(self, size):
+        self.totals = [0.0] * size
+
+    def add(self, values):
+        totals = self.totals
+        for i, value in enumerate(values):
+            totals[i] += value
+
+    def merge(self, other):
+        self.add(other.totals)
+
+
+class Confusion(Accumulator):
+    """Confusion matrix of actual and predicted classes, given as indices."""
+
+    def __init__(self, size):
+        self.counts = [[0] * size for _ in range(size)]
+
+    def add(self, actual, predicted):
+        self.counts[actual][predicted] += 1
+
+    def merge(self, other):
+        for row, other_row in zip(self.counts, other.counts):
+            for i, count in enumerate(other_row):
+                row[i] += count
+
+    def total(self):
+        """Return the number of predictions."""
+        return sum(map(sum, self.counts))
+
+    def actual_counts(self):
+        """Return how often each class occurred."""
+        return [sum(row) for row in self.counts]
+
+    def correct(self):
+        """Return the number of correct predictions."""
+        return sum(row[i] for i, row in enumerate(self.counts))
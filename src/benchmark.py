@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+
+"""Script to run micro-benchmarks of performance-critical code.
+
+This script requires Python 3.6 or higher."""
+
+
+import datetime
+import decimal
+import sys
+import timeit
+
+import data
+import football
+import probtools
+from predictors import strengths
+
+
+REPEAT = 5
+
+
+def benchmark_devaluation():
+    """Compare computing match weights with looking them up in the table.
+
+    The table is looked up once and then indexed, like `match_columns`
+    does.  `day_devaluation` looks it up for every weight."""
+
+    target = datetime.date(2019, 1, 1)
+    dates = [target - datetime.timedelta(age) for age in range(0, 3653, 3)] * 10
+
+    def formula():
+        for date in dates:
+            strengths.devaluation_formula((target - date).days)
+
+    def table():
+        weights = strengths.devaluation_table()
+        target_ordinal = target.toordinal()
+        for date in dates:
+            weights[target_ordinal - date.toordinal()]
+
+    def lookup():
+        target_ordinal = target.toordinal()
+        for date in dates:
+            strengths.day_devaluation(target_ordinal - date.toordinal())
+
+    print_timing('formula', formula, len(dates))
+    print_timing('table', table, len(dates))
+    print_timing('day_devaluation', lookup, len(dates))
+
+
+def benchmark_binomial():
+    """Compare the closed-form binomial CDF with summing up the terms.
+
+    Also check the accuracy of both against exact values, and exit with an
+    error if the closed form exceeds its error bound.  The accuracy is also
+    checked for larger `n`, with small `x` and around the mean, but the
+    summation is too slow to time there."""
+
+    cases = [
+        (x, n, p)
+        for n in (100, 1000, 10000)
+        for x in range(0, n + 1, n // 20)
+        for p in (0.01, 0.1, 0.3, 0.5, 0.8)
+    ]
+    accuracy_cases = list(cases)
+    for n in (1000, 10000, 50000, 100000):
+        for p in (6.4e-5, 0.001, 0.01, 0.1, 0.5, 0.8, 0.999):
+            mean = round(n * p)
+            xs = {*range(0, n + 1, n // 20), *range(10), *range(n - 9, n + 1)}
+            xs.update(range(max(mean - 50, 0), min(mean + 50, n + 1), 5))
+            accuracy_cases.extend((x, n, p) for x in sorted(xs))
+
+    exact_cdfs = {}
+    for _, n, p in accuracy_cases:
+        if (n, p) not in exact_cdfs:
+            exact_cdfs[n, p] = exact_binomial_cdfs(n, p)
+
+    closed_form_error = 0.0
+    for x, n, p in accuracy_cases:
+        exact = exact_cdfs[n, p]
+        ((lower_tail, upper_tail),) = probtools.binomial_tails([x], n, [p])
+        exact_upper_tail = 1 - exact[x - 1] if x else 1.0
+        closed_form_error = max(
+            closed_form_error,
+            abs(probtools.binomial_cdf(x, n, p) - exact[x]),
+            abs(lower_tail - exact[x]),
+            abs(upper_tail - exact_upper_tail),
+        )
+    by_sum_error = max(
+        abs(probtools.binomial_cdf_by_sum(x, n, p) - exact_cdfs[n, p][x])
+        for x, n, p in cases
+    )
+    print(f"largest error of closed form: {closed_form_error:.2e}")
+    print(f"largest error of sum: {by_sum_error:.2e}")
+
+    def closed_form():
+        for case in cases:
+            probtools.binomial_cdf(*case)
+
+    def by_sum():
+        for case in cases:
+            probtools.binomial_cdf_by_sum(*case)
+
+    print_timing('closed form', closed_form, len(cases))
+    print_timing('sum', by_sum, len(cases))
+
+    if closed_form_error > probtools.BINOMIAL_ERROR_BOUND:
+        print(
+            f"Error bound {probtools.BINOMIAL_ERROR_BOUND:.0e} exceeded",
+            file=sys.stderr,
+        )
+        exit(1)
+
+
+def exact_binomial_cdfs(n, p):
+    """Return the binomial CDF for 0, ..., n, with 40 significant digits."""
+    with decimal.localcontext() as context:
+        context.prec = 40
+        p = decimal.Decimal(p)
+        ratio = p / (1 - p)
+        term = (1 - p) ** n
+        total = 0
+        result = []
+        for k in range(n + 1):
+            total += term
+            result.append(float(total))
+            term = term * (n - k) / (k + 1) * ratio
+    return result
+
+
+def benchmark_parse():
+    """Compare the generic CSV parsing with the specialized row decoders."""
+
+    files = []
+    for competition in data.competitions():
+        files.append((data.matches_csv_path(competition), football.Match, competition))
+        files.append(
+            (data.fixtures_csv_path(competition), football.Fixture, competition)
+        )
+    count = sum(1 for arguments in files for _ in data.get_records(*arguments))
+
+    def generic():
+        for path, data_type, competition in files:
+            for fields in data.get_fields(path, data_type):
+                data_type(competition, **fields)
+
+    def decoders():
+        for arguments in files:
+            for _ in data.get_records(*arguments):
+                pass
+
+    print_timing('generic', generic, count)
+    print_timing('decoders', decoders, count)
+
+
+BENCHMARKS = {
+    'binomial': benchmark_binomial,
+    'devaluation': benchmark_devaluation,
+    'parse': benchmark_parse,
+}
+
+
+def print_timing(name, function, count):
+    """Time a function and print the best time per item."""
+    seconds = min(timeit.repeat(function, number=1, repeat=REPEAT))
+    print(f"{name}: {seconds / count * 1e9:.1f} ns per item")
+
+
+def print_help():
+    """Print a help message."""
+    if sys.argv and sys.argv[0]:
+        name = sys.argv[0]
+    else:
+        name = 'benchmark.py'
+    print(f"Usage: {name} benchmark", file=sys.stderr)
+    print("Valid benchmarks:", ', '.join(BENCHMARKS), file=sys.stderr)
+
+
+def main():
+    """Run a benchmark."""
+    name = sys.argv[1] if len(sys.argv) > 1 else ''
+    if name not in BENCHMARKS:
+        print_help()
+        exit(1)
+    BENCHMARKS[name]()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,307 @@
+"""Binary columnar caches of consolidated match data.
+
+A cache file stores every field of a competition's matches as a typed array,
+so that loading them skips parsing the CSV file.  Optional fields come with a
+mask of which values are present.  A cache is only used as long as the CSV
+file's modification time and size are unchanged."""
+
+
+import array
+import datetime
+import mmap
+import os
+import struct
+import sys
+
+import football
+
+
+MAGIC = b'FBMC'
+VERSION = 1
+
+# Magic, version, byte order, CSV modification time in nanoseconds, CSV size,
+# number of rows, size of the string table.
+HEADER = struct.Struct('<4sHBxqqqq')
+
+BYTE_ORDERS = {'little': 0, 'big': 1}
+
+# Columns start at multiples of this many bytes.
+ALIGNMENT = 8
+
+# The fields of a match, in order, without the competition.
+FIELDS = football.Match._fields[1:]
+
+STRING_FIELDS = {'home', 'away', 'stage'}
+
+# Field name -> array type code and whether the field is optional.  All other
+# fields are optional small integers.
+COLUMNS = {
+    'date': ('i', False),
+    'season': ('i', False),
+    'home': ('i', False),
+    'away': ('i', False),
+    'home_goals': ('h', False),
+    'away_goals': ('h', False),
+    'utc_time': ('q', True),
+    'stage': ('i', False),
+    'forfeited': ('b', True),
+}
+DEFAULT_COLUMN = 'h', True
+
+# Number of rows decoded at a time when reading a cache.
+CHUNK_SIZE = 256
+
+
+def cache_path(csv_path):
+    """Return the path of the cache file for a CSV file."""
+    return csv_path.with_suffix('.cache')
+
+
+def rows(csv_path):
+    """Return an iterator over the matches' field values in a cache file.
+
+    The values are decoded while iterating, `CHUNK_SIZE` rows at a time,
+    straight from the mapped file.  Return None if there is no cache for the
+    current version of the CSV file."""
+
+    try:
+        csv_stat = os.stat(csv_path)
+        file = open(cache_path(csv_path), 'rb')
+    except OSError:
+        return None
+
+    with file:
+        try:
+            mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # Empty files can't be mapped.
+            return None
+
+    view = memoryview(mapping)
+    try:
+        layout = read_layout(view, csv_stat)
+    except (ValueError, TypeError, IndexError, struct.error) as exc:
+        print("Couldn't read cache file:", exc, file=sys.stderr)
+        layout = None
+    if layout is None:
+        view.release()
+        mapping.close()
+        return None
+    return iter_rows(mapping, view, *layout)
+
+
+def read_layout(view, csv_stat):
+    """Return the number of rows, the strings and the columns of a cache.
+
+    Columns are (field name, type code, offset, offset of the mask or None)
+    tuples.  Return None if the cache is outdated."""
+
+    if len(view) < HEADER.size:
+        return None
+    magic, version, byte_order, mtime_ns, size, num_rows, strings_size = (
+        HEADER.unpack_from(view)
+    )
+    if (
+        magic != MAGIC
+        or version != VERSION
+        or byte_order != BYTE_ORDERS[sys.byteorder]
+        or mtime_ns != csv_stat.st_mtime_ns
+        or size != csv_stat.st_size
+    ):
+        return None
+
+    offset = HEADER.size
+    strings = str(view[offset : offset + strings_size], 'utf-8').split('\0')
+    offset = aligned(offset + strings_size)
+
+    def skip_column(type_code):
+        nonlocal offset
+        start = offset
+        end = offset + num_rows * array.array(type_code).itemsize
+        if end > len(view):
+            raise ValueError("truncated cache file")
+        offset = aligned(end)
+        return start
+
+    columns = []
+    for name in FIELDS:
+        type_code, optional = COLUMNS.get(name, DEFAULT_COLUMN)
+        values_offset = skip_column(type_code)
+        mask_offset = skip_column('B') if optional else None
+        columns.append((name, type_code, values_offset, mask_offset))
+    return num_rows, strings, columns
+
+
+def iter_rows(mapping, view, num_rows, strings, columns):
+    """Yield the field values of each row, decoding a chunk at a time.
+
+    The mapping is closed when the iteration is done."""
+
+    # Dates and seasons repeat throughout the file, other values don't.
+    memos = {'date': {}, 'season': {}}
+    try:
+        for start in range(0, num_rows, CHUNK_SIZE):
+            stop = min(start + CHUNK_SIZE, num_rows)
+            chunk = []
+            for name, type_code, values_offset, mask_offset in columns:
+                values = read_values(view, type_code, values_offset, start, stop)
+                values = decode(name, values, strings, memos.get(name, {}))
+                if mask_offset is not None:
+                    mask = read_values(view, 'B', mask_offset, start, stop)
+                    values = [
+                        value if present else None
+                        for value, present in zip(values, mask)
+                    ]
+                chunk.append(values)
+            yield from zip(*chunk)
+    finally:
+        view.release()
+        mapping.close()
+
+
+def read_values(view, type_code, offset, start, stop):
+    """Return the values of rows `start` to `stop` of a column."""
+    itemsize = array.array(type_code).itemsize
+    part_start = offset + start * itemsize
+    part_end = offset + stop * itemsize
+    with view[part_start:part_end] as part, part.cast(type_code) as values:
+        return values.tolist()
+
+
+class Writer:
+    """Encoder of matches for a cache file, as they're read from the CSV file.
+
+    Only the encoded columns are kept, not the matches."""
+
+    def __init__(self, csv_path):
+        self.csv_path = csv_path
+        self.num_rows = 0
+        self.strings = []
+        self.string_ids = {}
+        # (Field name, values, mask of present values or None).
+        self.columns = []
+        for name in FIELDS:
+            type_code, optional = COLUMNS.get(name, DEFAULT_COLUMN)
+            mask = array.array('B') if optional else None
+            self.columns.append((name, array.array(type_code), mask))
+        try:
+            # Taken before reading the CSV file, so that changes while reading
+            # make the cache outdated.
+            self.csv_stat = os.stat(csv_path)
+        except OSError as exc:
+            print("Couldn't write cache file:", exc, file=sys.stderr)
+            self.csv_stat = None
+
+    def add(self, match):
+        """Encode a match."""
+        if self.csv_stat is None:
+            return
+        try:
+            for (name, values, mask), value in zip(self.columns, match[1:]):
+                if value is None:
+                    values.append(0)
+                else:
+                    values.append(encode(name, value, self.string_ids, self.strings))
+                if mask is not None:
+                    mask.append(value is not None)
+        except OverflowError as exc:
+            print("Couldn't write cache file:", exc, file=sys.stderr)
+            self.csv_stat = None
+        self.num_rows += 1
+
+    def save(self):
+        """Store the encoded matches in the cache file, replacing it."""
+
+        if self.csv_stat is None:
+            return
+        path = cache_path(self.csv_path)
+        temporary_path = path.with_name(path.name + '.tmp')
+        try:
+            file = open(temporary_path, 'wb')
+        except OSError as exc:
+            print("Couldn't write cache file:", exc, file=sys.stderr)
+            return
+
+        strings_bytes = '\0'.join(self.strings).encode('utf-8')
+        header = HEADER.pack(
+            MAGIC,
+            VERSION,
+            BYTE_ORDERS[sys.byteorder],
+            self.csv_stat.st_mtime_ns,
+            self.csv_stat.st_size,
+            self.num_rows,
+            len(strings_bytes),
+        )
+
+        with file:
+            write_aligned(file, header + strings_bytes)
+            for _, values, mask in self.columns:
+                write_aligned(file, values.tobytes())
+                if mask is not None:
+                    write_aligned(file, mask.tobytes())
+
+        try:
+            os.replace(temporary_path, path)
+        except OSError as exc:
+            print("Couldn't replace cache file:", exc, file=sys.stderr)
+
+
+def encode(name, value, string_ids, strings):
+    """Return the integer stored for a field value."""
+    if name in STRING_FIELDS:
+        string_id = string_ids.get(value)
+        if string_id is None:
+            string_id = string_ids[value] = len(strings)
+            strings.append(value)
+        return string_id
+    if name == 'date':
+        return value.toordinal()
+    if name == 'season':
+        return value.start * 2 + value.ends_following_year
+    if name == 'utc_time':
+        return (value - football.EPOCH) // datetime.timedelta(seconds=1)
+    return int(value)
+
+
+def decode(name, values, strings, memo):
+    """Return the field values, given the stored integers.
+
+    `memo` is a dict of values decoded before, which is updated."""
+    if name in STRING_FIELDS:
+        return [strings[value] for value in values]
+    if name == 'date':
+        return memoized(datetime.date.fromordinal, values, memo)
+    if name == 'season':
+        return memoized(
+            lambda value: football.Season(value // 2, bool(value % 2)), values, memo
+        )
+    if name == 'utc_time':
+        return memoized(
+            lambda value: football.EPOCH + datetime.timedelta(seconds=value),
+            values,
+            memo,
+        )
+    if name == 'forfeited':
+        return [bool(value) for value in values]
+    return values
+
+
+def memoized(function, values, results):
+    """Return the function applied to each value, computed once per value.
+
+    `results` maps values to their results, and is updated."""
+
+    for value in set(values).difference(results):
+        results[value] = function(value)
+    return [results[value] for value in values]
+
+
+def write_aligned(file, data):
+    """Write bytes to a file, padded to the alignment of columns."""
+    file.write(data)
+    file.write(bytes(aligned(len(data)) - len(data)))
+
+
+def aligned(offset):
+    """Return the next offset that is a multiple of `ALIGNMENT`."""
+    return -(-offset // ALIGNMENT) * ALIGNMENT
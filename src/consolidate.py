@@ -10,6 +10,7 @@ import csv
 import datetime
 import sys
 
+import data
 import datetools
 import football
 import paths
@@ -78,11 +79,41 @@ def consolidate_matches(competition, sources_iter):
         print("Couldn't open CSV file to write to:", exc, file=sys.stderr)
         return
 
+    sorted_matches = sorted(matches_iter, key=sort_key)
     with file:
         writer = csv.writer(file)
-        for match in sorted(matches_iter, key=sort_key):
+        for match in sorted_matches:
             writer.writerow(row_from_match(match))
 
+    store_play_windows(competition, sorted_matches)
+
+
+def store_play_windows(competition, matches):
+    """Store the play windows of matches, which evaluations need.
+
+    The matches' CSV file must have been written already."""
+
+    path = data.play_windows_csv_path(competition)
+    header = data.play_windows_header(competition)
+    if header is None:
+        print("Couldn't access CSV file for play windows", file=sys.stderr)
+        return
+
+    try:
+        file = open(path, 'w', encoding='utf-8', newline='')
+    except OSError as exc:
+        print("Couldn't open CSV file for play windows:", exc, file=sys.stderr)
+        return
+
+    with file:
+        writer = csv.writer(file)
+        writer.writerow(header)
+        for match in matches:
+            earliest_offset, latest_offset = football.play_window_offsets(match)
+            writer.writerow(
+                (match.date, match.home, match.away, earliest_offset, latest_offset)
+            )
+
 
 def consolidate_fixtures(competition, sources_iter):
     """Consolidate and store all fixtures."""
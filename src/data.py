@@ -1,22 +1,52 @@
 """Access to football match data."""
 
 
+import array
+import bisect
+import collections
 import csv
+import functools
+import hashlib
+import heapq
+import itertools
 import operator
+import os
 import sys
 
+import cache
 import datetools
 import football
 import paths
 
 
+# Identifies the format of play windows files, see `play_windows_header`.
+PLAY_WINDOWS_FORMAT = 'play-windows-1'
+
+
 def matches():
     """Return all matches ordered by date."""
-    result = []
-    for competition in competitions():
-        for match in competition_matches(competition):
-            result.append(match)
-    return sorted(result, key=operator.attrgetter('date'))
+    return list(iter_matches())
+
+
+def match_table():
+    """Return all matches ordered by date, in a compact table.
+
+    The rows behave like matches.  Their statistics, such as shots and
+    cards, are only loaded when they're first used."""
+
+    return football.MatchTable.from_matches(iter_matches(), stats_loader=iter_matches)
+
+
+def iter_matches():
+    """Yield all matches ordered by date.
+
+    The competitions' matches are merged as they're read, which relies on
+    consolidate.py storing them sorted by date.  Matches on the same date
+    are in the same order as in a stable sort of all competitions' matches,
+    one competition after another."""
+
+    streams = [competition_matches(competition) for competition in competitions()]
+    return heapq.merge(*streams, key=operator.attrgetter('date'))
 
 
 def competitions():
@@ -28,38 +58,290 @@ def competitions():
         print("Couldn't list CSV files:", exc, file=sys.stderr)
         return []
 
-    def key(competition):
-        if competition.name == 'premier':
-            return football.Competition(competition.region, '1st-league')
-        return competition
-
     result_set = {extract_competition(path) for path in csv_paths}
-    return sorted(result_set, key=key)
+    return sorted(result_set, key=competition_key)
+
+
+def matches_stamp(competitions):
+    """Return the modification times and sizes of competitions' CSV files.
+
+    Return None if any of them is inaccessible."""
+
+    stamp = []
+    for competition in sorted(competitions):
+        try:
+            csv_stat = os.stat(matches_csv_path(competition))
+        except OSError:
+            return None
+        stamp.append((*competition, csv_stat.st_mtime_ns, csv_stat.st_size))
+    return stamp
+
+
+def competition_key(competition):
+    """Return a key for sorting competitions, with top leagues first."""
+    if competition.name == 'premier':
+        return football.Competition(competition.region, '1st-league')
+    return competition
 
 
 def competition_matches(competition):
-    """Yield all matches of a competition."""
+    """Yield all matches of a competition.
+
+    They're read from the binary cache next to the CSV file, which is
+    created or updated whenever the CSV file is newer.  Either way, they're
+    decoded as they're iterated over."""
+
     path = matches_csv_path(competition)
-    for fields in get_fields(path, football.Match):
-        yield football.Match(competition, **fields)
+    rows = cache.rows(path)
+    if rows is not None:
+        make_match = functools.partial(football.Match, competition)
+        yield from itertools.starmap(make_match, rows)
+        return
+
+    writer = cache.Writer(path)
+    for match in get_records(path, football.Match, competition):
+        writer.add(match)
+        yield match
+    if writer.num_rows:
+        writer.save()
 
 
 def competition_fixtures(competition):
     """Yield all future fixtures of a competition."""
     path = fixtures_csv_path(competition)
-    for fields in get_fields(path, football.Fixture):
-        yield football.Fixture(competition, **fields)
+    yield from get_records(path, football.Fixture, competition)
+
+
+def play_windows():
+    """Return the stored play windows of all matches.
+
+    Map (competition, date, home, away) to the earliest start and latest end
+    dates in UTC, as offsets in days from the local date.  Matches are missing
+    if their file was consolidated before play windows were stored, or if the
+    play windows are outdated, see `play_windows_header`."""
+
+    result = {}
+    for competition in competitions():
+        path = play_windows_csv_path(competition)
+        header = play_windows_header(competition)
+        if header is None or not path.exists():
+            continue
+        try:
+            file = open(path, encoding='utf-8', newline='')
+        except OSError as exc:
+            print("Couldn't open CSV file:", exc, file=sys.stderr)
+            continue
+
+        parse_date = date_parser()
+        with file:
+            reader = csv.reader(file)
+            if next(reader, None) != header:
+                print(f"Ignoring outdated play windows file {path}", file=sys.stderr)
+                continue
+            for date_str, home, away, earliest_offset, latest_offset in reader:
+                key = competition, parse_date(date_str), home, away
+                result[key] = int(earliest_offset), int(latest_offset)
+    return result
+
+
+def play_windows_header(competition):
+    """Return the first row of a competition's play windows file.
+
+    Like the header of a cache file, it identifies the format, the settings
+    that play windows depend on, and the modification time and size of the
+    matches' CSV file.  Return None if the CSV file is inaccessible."""
+
+    try:
+        csv_stat = os.stat(matches_csv_path(competition))
+    except OSError:
+        return None
+    settings = football.play_window_settings().encode()
+    return [
+        PLAY_WINDOWS_FORMAT,
+        hashlib.sha256(settings).hexdigest()[:16],
+        str(csv_stat.st_mtime_ns),
+        str(csv_stat.st_size),
+    ]
 
 
 def season_fixtures(competition, season):
     """Yield all future fixtures of a season."""
+    yield from fixtures_by_season(competition).get(season, ())
+
+
+@functools.lru_cache()
+def fixtures_by_season(competition):
+    """Return a competition's future fixtures, grouped by season.
+
+    The fixtures file is only read once."""
+
+    result = collections.defaultdict(list)
     for fixture in competition_fixtures(competition):
-        if fixture.season == season:
-            yield fixture
+        result[fixture.season].append(fixture)
+    return {season: tuple(fixtures) for season, fixtures in result.items()}
+
+
+class MatchIndex:
+    """Indexes for querying matches by competition, season, team and date.
+
+    The matches must be a sequence sorted by date, such as the result of
+    `matches` or `match_table`.  Queries return matches in that order and
+    take time proportional to their results, plus a binary search for date
+    ranges."""
+
+    def __init__(self, matches):
+        self.matches = matches
+        self.ordinals = array.array('i')
+        # Team -> indices of the team's matches.
+        self.team_rows = collections.defaultdict(list)
+        rows_by_season = collections.defaultdict(list)
+        for row, match in enumerate(matches):
+            self.ordinals.append(match.date.toordinal())
+            self.team_rows[match.home].append(row)
+            self.team_rows[match.away].append(row)
+            rows_by_season[match.competition, match.season].append(row)
+
+        # Indices of all matches, grouped by competition and season, and
+        # competition -> season -> range of those indices.
+        self.season_order = array.array('i')
+        self.season_ranges = collections.defaultdict(dict)
+        for (competition, season), rows in sorted(rows_by_season.items()):
+            start = len(self.season_order)
+            self.season_order.extend(rows)
+            self.season_ranges[competition][season] = start, len(self.season_order)
+
+    def season_matches(self, competition, season):
+        """Return the matches of a competition's season."""
+        start, stop = self.season_ranges.get(competition, {}).get(season, (0, 0))
+        return [self.matches[row] for row in self.season_order[start:stop]]
+
+    def competition_seasons(self, competition):
+        """Return the seasons of a competition that have matches, in order."""
+        return sorted(self.season_ranges.get(competition, {}))
+
+    def team_matches(self, team, start=None, stop=None):
+        """Return the matches of a team, optionally from `start` to `stop`.
+
+        `start` is inclusive and `stop` exclusive."""
+
+        rows = self.team_rows.get(team, [])
+        if start is not None or stop is not None:
+            first, last = self.date_range_rows(start, stop)
+            low = bisect.bisect_left(rows, first)
+            high = bisect.bisect_left(rows, last, low)
+            rows = rows[low:high]
+        return [self.matches[row] for row in rows]
+
+    def date_range(self, start=None, stop=None):
+        """Return the matches from `start` to `stop`, which is exclusive."""
+        first, last = self.date_range_rows(start, stop)
+        return self.matches[first:last]
+
+    def date_range_rows(self, start, stop):
+        """Return the range of indices of the matches from `start` to `stop`."""
+        ordinals = self.ordinals
+        first = 0
+        if start is not None:
+            first = bisect.bisect_left(ordinals, start.toordinal())
+        last = len(ordinals)
+        if stop is not None:
+            last = bisect.bisect_left(ordinals, stop.toordinal(), first)
+        return first, last
+
+
+def get_records(path, data_type, competition):
+    """Yield all records of a CSV file, e.g. matches or fixtures."""
+
+    decode = row_decoder(data_type)
+
+    try:
+        file = open(path, encoding='utf-8', newline='')
+    except OSError as exc:
+        print("Couldn't open CSV file:", exc, file=sys.stderr)
+        return
+
+    parse_date = date_parser()
+    with file:
+        for row in csv.reader(file):
+            yield decode(row, competition, parse_date)
+
+
+def date_parser():
+    """Return a function that parses ISO dates, for the rows of one file.
+
+    It's memoized, as many rows share their dates."""
+
+    return functools.lru_cache(maxsize=None)(datetools.date_from_iso)
+
+
+@functools.lru_cache()
+def row_decoder(data_type):
+    """Return a function that turns CSV rows into records of a type.
+
+    Same results as `get_fields` and `parse_field`, but the conversion of
+    each column is looked up in advance.  The function takes a row, the
+    competition and a function from `date_parser`."""
+
+    names = data_type._fields[1:]
+    converters = [COLUMN_CONVERTERS.get(name, optional_int) for name in names]
+    date_index = names.index('date')
+    time_index = names.index('utc_time')
+
+    def decode(row, competition, parse_date):
+        date = parse_date(row[date_index])
+        values = [convert(value) for convert, value in zip(converters, row)]
+        values[date_index] = date
+        if len(values) > time_index:
+            values[time_index] = parse_utc_time(row[time_index], date)
+        return data_type(competition, *values)
+
+    return decode
+
+
+def optional_int(value):
+    """Return an int, or None for an empty string."""
+    return int(value) if value else None
+
+
+def parse_utc_time(value, date):
+    """Return a UTC time as a datetime object, or None for an empty string."""
+    if not value:
+        return None
+    try:
+        return datetools.datetime_from_time_str(value, date)
+    except ValueError:
+        pass
+    return datetools.datetime_from_iso(value)
+
+
+def parse_bool(value):
+    """Return a bool, or None for an empty string."""
+    if not value:
+        return None
+    if value not in {'0', '1'}:
+        raise ValueError(f"Boolean field should be 0 or 1, is {value!r}")
+    return value == '1'
+
+
+# Field name -> function converting a column.  Dates and times are converted
+# separately, as the time depends on the date.
+COLUMN_CONVERTERS = {
+    'date': str,
+    'utc_time': str,
+    'season': functools.lru_cache()(football.Season.from_str),
+    'home': str,
+    'away': str,
+    'stage': str,
+    'home_goals': int,
+    'away_goals': int,
+    'forfeited': parse_bool,
+}
 
 
 def get_fields(path, data_type):
-    """Yield all parsed fields sequences of a CSV file."""
+    """Yield all parsed fields sequences of a CSV file.
+
+    This is the reference implementation, see `row_decoder`."""
 
     try:
         file = open(path, encoding='utf-8', newline='')
@@ -118,3 +400,9 @@ def fixtures_csv_path(competition):
     """Return the path for a competition's CSV file."""
     filename = f'{competition.region}_{competition.name}_fixtures.csv'
     return paths.CONSOLIDATED_DIR / filename
+
+
+def play_windows_csv_path(competition):
+    """Return the path for a competition's play windows CSV file."""
+    filename = f'{competition.region}_{competition.name}_windows.csv'
+    return paths.CONSOLIDATED_DIR / filename
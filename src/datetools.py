@@ -104,6 +104,11 @@ def date_from_iso(date_str):
 
     May raise a ValueError."""
 
+    # Taking the string apart is much faster than strptime.
+    if len(date_str) == 10 and date_str[4] == date_str[7] == '-':
+        return datetime.date(
+            int(date_str[:4]), int(date_str[5:7]), int(date_str[8:])
+        )
     return parse_date(date_str, '%Y-%m-%d')
 
 
@@ -112,6 +117,19 @@ def datetime_from_iso(datetime_str):
 
     May raise a ValueError."""
 
+    if (
+        len(datetime_str) == 16
+        and datetime_str[4] == datetime_str[7] == '-'
+        and datetime_str[10] == ' '
+        and datetime_str[13] == ':'
+    ):
+        return datetime.datetime(
+            int(datetime_str[:4]),
+            int(datetime_str[5:7]),
+            int(datetime_str[8:10]),
+            int(datetime_str[11:13]),
+            int(datetime_str[14:]),
+        )
     return parse_datetime(datetime_str, ISO_DATETIME_FORMAT)
 
 
@@ -121,7 +139,14 @@ def datetime_to_iso(datetime_obj):
 
 
 def datetime_from_time_str(time_str, date):
-    """Return a datetime.datetime object."""
+    """Return a datetime.datetime object.
+
+    May raise a ValueError."""
+
+    if len(time_str) == 5 and time_str[2] == ':':
+        return datetime.datetime(
+            date.year, date.month, date.day, int(time_str[:2]), int(time_str[3:])
+        )
     time_obj = datetime.datetime.strptime(time_str, TIME_FORMAT).time()
     return datetime.datetime.combine(date, time_obj)
 
@@ -5,79 +5,241 @@
 This script requires Python 3.6 or higher."""
 
 
+import argparse
+import bisect
 import collections
+import contextlib
 import datetime
+import io
 import math
-import statistics
+import multiprocessing
 import sys
 
+import accumulators
 import data
 import datetools
 import football
 import prediction
 import predictors
 import probtools
+import stats
 
 
 DEFAULT_P = 0.005
 
-# Date rolls over at this UTC time.
-UTC_DATE_CUTOFF = datetime.time(5)
-
-# Maximum match duration.
-MAX_DURATION = datetime.timedelta(hours=3)
-
 ONE_DAY = datetime.timedelta(1)
 
-
-def print_evaluation(predictor, all_matches, prediction_start):
+PREDICTION_START = datetime.date(2016, 7, 20)
+
+# Matches available to worker processes, set when they start.
+worker_matches = []
+
+
+class Evaluation(accumulators.Accumulator):
+    """The evaluation of a predictor, tallied per competition and season.
+
+    Predictions are tallied separately so that the totals don't depend on how
+    the competitions' predictions are interleaved.  Evaluations of disjoint
+    sets of regions can thus be merged into the same result as a single run,
+    and the tallies can be rolled up by region or competition."""
+
+    def __init__(self, name):
+        self.name = name
+        # (Competition, season) -> tally.
+        self.tallies = {}
+        # (Region, competition) -> rolled up tally, until tallies change.
+        self.total_caches = {}
+
+    def add(self, competition, season, probabilities, category_id, result_id):
+        """Evaluate a prediction, given the actual category and result IDs."""
+        key = competition, season
+        tally = self.tallies.get(key)
+        if tally is None:
+            tally = self.tallies[key] = Tally()
+        tally.add(probabilities, category_id, result_id)
+        self.total_caches.clear()
+
+    def merge(self, other):
+        """Add the tallies of another evaluation of the same predictor."""
+        for key, tally in other.tallies.items():
+            if key in self.tallies:
+                self.tallies[key].merge(tally)
+            else:
+                self.tallies[key] = tally
+        self.total_caches.clear()
+
+    def total(self, region=None, competition=None):
+        """Return the tally over everything, a region or a competition.
+
+        The tallies are rolled up in a fixed order, and the result is cached
+        until they change."""
+
+        cache_key = region, competition
+        if cache_key in self.total_caches:
+            return self.total_caches[cache_key]
+
+        total = Tally()
+        for (tally_competition, _), tally in sorted(self.tallies.items()):
+            if region is not None and tally_competition.region != region:
+                continue
+            if competition is not None and tally_competition != competition:
+                continue
+            total.merge(tally)
+        self.total_caches[cache_key] = total
+        return total
+
+    def breakdown(self):
+        """Return the tallies by region, competition and season, in order."""
+        result = {}
+        for competition, season in sorted(self.tallies, key=breakdown_key):
+            competitions = result.setdefault(competition.region, {})
+            tally = self.tallies[competition, season]
+            competitions.setdefault(competition, {})[season] = tally
+        return result
+
+
+class Tally(accumulators.Accumulator):
+    """Accumulated statistics about predictions."""
+
+    def __init__(self):
+        self.scores = accumulators.Moments()
+        self.probabilities = accumulators.Sums(prediction.num_categories())
+        self.result_probabilities = accumulators.Sums(len(football.RESULTS))
+        self.categories = accumulators.Confusion(prediction.num_categories())
+        self.results = accumulators.Confusion(len(football.RESULTS))
+
+    def add(self, probabilities, category_id, result_id):
+        """Evaluate a prediction, given the actual category and result IDs."""
+
+        if not probtools.is_distribution(probabilities.values()):
+            raise ValueError("invalid probability distribution")
+        self.scores.add(probabilities.log_likelihood(category_id))
+        self.probabilities.add(probabilities.values())
+        self.result_probabilities.add(probabilities.result_probabilities())
+        self.categories.add(category_id, probabilities.most_likely_id())
+        self.results.add(result_id, probabilities.most_likely_result_id())
+
+    def merge(self, other):
+        """Add the statistics of another tally."""
+        self.scores.merge(other.scores)
+        self.probabilities.merge(other.probabilities)
+        self.result_probabilities.merge(other.result_probabilities)
+        self.categories.merge(other.categories)
+        self.results.merge(other.results)
+
+    def mean_points(self):
+        """Return the mean log-likelihood, scaled so that guessing gets 0."""
+        return self.scores.mean / math.log(prediction.num_categories()) + 1
+
+    def points_standard_error(self):
+        """Return the standard error of the mean points."""
+        return self.scores.standard_error() / math.log(prediction.num_categories())
+
+
+def breakdown_key(key):
+    """Return a key for sorting (competition, season) pairs in breakdowns."""
+    competition, season = key
+    return data.competition_key(competition), season
+
+
+def print_evaluation(predictor, all_matches, prediction_start, breakdown=False):
     """Evaluate a predictor.
 
     `all_matches` must be sorted ascending by date."""
 
-    print(f'# Predictor {predictor.name!r} #')
-    print()
+    (evaluation,) = evaluate([predictor], all_matches, prediction_start)
+    print_report(evaluation, breakdown)
+
+
+def evaluate(predictors_seq, all_matches, prediction_start, interim_days=None):
+    """Evaluate several predictors in a single walk through the history.
+
+    Return an evaluation for each predictor.  `all_matches` must be sorted
+    ascending by date.  If `interim_days` is given, print intermediate
+    results to stderr at that interval."""
+
+    windows = backtest(predictors_seq, all_matches, [prediction_start], interim_days)
+    return windows[prediction_start]
+
+
+def backtest(predictors_seq, all_matches, cutoffs, interim_days=None):
+    """Evaluate several predictors from several start dates in a single walk.
+
+    Return a dict mapping each cutoff date to an evaluation for each
+    predictor, covering the predictions of matches starting on or after that
+    date.  The predictors are fed the whole history either way.
+    `all_matches` must be sorted ascending by date.  If `interim_days` is
+    given, print intermediate results to stderr at that interval.
+
+    A window can differ from a separate evaluation from its cutoff, by more
+    than the solver tolerance: predictors that warm-start, like the strength
+    model, have made predictions before the cutoff, and their capped warm
+    updates don't converge to the state a cold start reaches."""
+
+    cutoffs = sorted(set(cutoffs))
+    # Each prediction is tallied for the latest cutoff before it only, and
+    # the windows are merged from these segments in the end.
+    segments = [
+        [Evaluation(predictor.name) for predictor in predictors_seq]
+        for _ in cutoffs
+    ]
+
+    steps = timeline(all_matches, cutoffs[0])
+    for day, (fixtures_list, matches) in enumerate(steps, 1):
+        if interim_days and day % interim_days == 0:
+            print_interim(merge_segments(segments)[0], day)
+        fixtures = [fixture for fixture, *_ in fixtures_list]
+        segment_indices = [
+            bisect.bisect_right(cutoffs, earliest_start) - 1
+            for _, earliest_start, *_ in fixtures_list
+        ]
+        for index, predictor in enumerate(predictors_seq):
+            predictions = predictor.predict_many(fixtures)
+            for element, segment_index, probabilities in zip(
+                fixtures_list, segment_indices, predictions
+            ):
+                fixture, _, category_id, result_id = element
+                evaluation = segments[segment_index][index]
+                evaluation.add(
+                    fixture.competition,
+                    fixture.season,
+                    probabilities,
+                    category_id,
+                    result_id,
+                )
+            predictor.feed_matches(matches)
+
+    return dict(zip(cutoffs, merge_segments(segments)))
+
+
+def merge_segments(segments):
+    """Return the evaluations of each segment merged with all later ones."""
+
+    result = []
+    merged = [Evaluation(evaluation.name) for evaluation in segments[0]]
+    for segment in reversed(segments):
+        merged = [evaluation.snapshot() for evaluation in merged]
+        for evaluation, segment_evaluation in zip(merged, segment):
+            evaluation.merge(segment_evaluation.snapshot())
+        result.append(merged)
+    result.reverse()
+    return result
+
+
+def timeline(all_matches, prediction_start):
+    """Yield what to predict and what to feed, one day at a time.
+
+    Each step is a list of fixtures to predict, as (fixture, earliest start
+    date, category ID, result ID) tuples, and a list of matches to feed after
+    predicting them.
+    `all_matches` must be sorted ascending by date."""
 
-    all_scores = []
-    total_probabilities = collections.defaultdict(float)
-    total_result_probabilities = collections.defaultdict(float)
-    category_counts = collections.Counter()
-    result_counts = collections.Counter()
+    windows = data.play_windows()
 
     # 3 days: yesterday, today, tomorrow.  By latest end date / earliest start.
     matches_by_end_date = collections.deque([[], [], []], maxlen=3)
     fixtures_by_start_date = collections.deque([[], [], []], maxlen=3)
 
-    correct_categories = 0
-    correct_results = 0
-
-    def get_scores():
-        """Pop some fixtures, let the predictor predict, then evaluate it."""
-        nonlocal correct_categories
-        nonlocal correct_results
-        fixtures_list = fixtures_by_start_date.popleft()
-        for fixture, correct_category in fixtures_list:
-            probabilities = predictor.predict(fixture)
-            if not probtools.is_distribution(probabilities.values()):
-                raise ValueError("invalid probability distribution")
-            probability = probabilities[correct_category]
-            score = math.log(probability) if probability > 0 else -math.inf
-            all_scores.append(score)
-            category_counts[correct_category] += 1
-            result_counts[football.result(correct_category)] += 1
-            result_probabilities = collections.defaultdict(float)
-            for category, probability in probabilities.items():
-                total_probabilities[category] += probability
-                result_probabilities[football.result(category)] += probability
-            for result, probability in result_probabilities.items():
-                total_result_probabilities[result] += probability
-            category_guess = max(probabilities, key=probabilities.get)
-            if category_guess == correct_category:
-                correct_categories += 1
-            result_guess = max(result_probabilities, key=result_probabilities.get)
-            if result_guess == football.result(correct_category):
-                correct_results += 1
-
     previous_today = None
     for match in all_matches:
         today = match.date
@@ -85,52 +247,65 @@ def print_evaluation(predictor, all_matches, prediction_start):
             previous_today = today
 
         while previous_today < today:
-            get_scores()
+            yield fixtures_by_start_date.popleft(), matches_by_end_date.popleft()
             fixtures_by_start_date.append([])
-
-            for stored_match in matches_by_end_date.popleft():
-                predictor.feed_match(stored_match)
             matches_by_end_date.append([])
-
             previous_today += ONE_DAY
 
-        earliest_start, latest_end = earliest_latest(match)
-        start_diff = (earliest_start - today).days
+        key = match.competition, today, match.home, match.away
+        window = windows.get(key)
+        if window is None:
+            window = football.play_window_offsets(match)
+        start_diff, end_diff = window
         if not -1 <= start_diff <= 1:
+            earliest_start = today + start_diff * ONE_DAY
             print(
                 f"Weird start date: expected {today} +/- 1 day, got {earliest_start}.",
                 file=sys.stderr,
             )
             exit()
             continue
-        end_diff = (latest_end - today).days
         if not -1 <= end_diff <= 1:
+            latest_end = today + end_diff * ONE_DAY
             print(
                 f"Weird end date: expected {today} +/- 1 day, got {latest_end}.",
                 file=sys.stderr,
             )
             continue
 
+        earliest_start = today + start_diff * ONE_DAY
         if earliest_start >= prediction_start:
             fixture = football.Fixture.from_match(match)
-            element = fixture, prediction.category(match)
+            category_id = prediction.category_id(match)
+            result_id = prediction.result_id_from_goals(
+                match.home_goals, match.away_goals
+            )
+            element = fixture, earliest_start, category_id, result_id
             fixtures_by_start_date[start_diff + 1].append(element)
         matches_by_end_date[end_diff + 1].append(match)
 
     while fixtures_by_start_date or matches_by_end_date:
-        get_scores()
-        for match in matches_by_end_date.popleft():
-            predictor.feed_match(match)
+        yield fixtures_by_start_date.popleft(), matches_by_end_date.popleft()
+
 
-    factor = math.log(prediction.num_categories())
-    points = statistics.mean(all_scores) / factor + 1
-    print(f"Mean points: {points:.3f}")
+def print_report(evaluation, breakdown=False):
+    """Print the evaluation of a predictor.
+
+    With `breakdown`, also print a summary per region, competition and
+    season."""
+
+    print(f'# Predictor {evaluation.name!r} #')
     print()
 
-    num_predictions = len(all_scores)
+    tally = evaluation.total()
+    error = tally.points_standard_error()
+    print(f"Mean points: {tally.mean_points():.3f} (standard error {error:.3f})")
+    print()
 
-    category_ratio = correct_categories / num_predictions
-    result_ratio = correct_results / num_predictions
+    num_predictions = tally.scores.count
+
+    category_ratio = tally.categories.correct() / num_predictions
+    result_ratio = tally.results.correct() / num_predictions
     print(f"Guessed category: {category_ratio:.2%}")
     print(f"Guessed result (1/X/2): {result_ratio:.2%}")
     print()
@@ -139,20 +314,26 @@ def print_evaluation(predictor, all_matches, prediction_start):
         f"## Mean prediction and deviations from true percentage (p<{DEFAULT_P:.1%}) ##"
     )
 
-    for result in '1', 'X', '2':
-        average_prob = total_result_probabilities[result] / num_predictions
-        count = result_counts[result]
-        bias_str = get_bias_str(average_prob, count, num_predictions)
+    average_probs = [
+        total / num_predictions for total in tally.result_probabilities.totals
+    ]
+    result_counts = tally.results.actual_counts()
+    bias_strs = get_bias_strs(average_probs, result_counts, num_predictions)
+    for result, average_prob, bias_str in zip(
+        football.RESULTS, average_probs, bias_strs
+    ):
         if bias_str:
             suffix = f' ({bias_str})'
         else:
             suffix = ''
         print(f'{result} {average_prob:6.2%}{suffix}')
 
-    for category in prediction.categories():
-        average_prob = total_probabilities[category] / num_predictions
-        count = category_counts[category]
-        bias_str = get_bias_str(average_prob, count, num_predictions)
+    average_probs = [total / num_predictions for total in tally.probabilities.totals]
+    category_counts = tally.categories.actual_counts()
+    bias_strs = get_bias_strs(average_probs, category_counts, num_predictions)
+    for category, average_prob, bias_str in zip(
+        prediction.categories(), average_probs, bias_strs
+    ):
         prediction_str = prediction.category_to_str(category)
         if bias_str:
             suffix = f' ({bias_str})'
@@ -162,60 +343,258 @@ def print_evaluation(predictor, all_matches, prediction_start):
 
     print()
 
+    if breakdown:
+        print_breakdown(evaluation)
+
+
+def print_breakdown(evaluation):
+    """Print summaries of an evaluation per region, competition and season."""
+
+    for region, tallies_by_competition in evaluation.breakdown().items():
+        stats.print_title(region.title())
+        if len(tallies_by_competition) > 1:
+            print(summary_str(evaluation.total(region=region)))
+            print()
+
+        for competition, tallies_by_season in tallies_by_competition.items():
+            stats.print_title(competition.name, 2)
+            print(summary_str(evaluation.total(competition=competition)))
+            for season, tally in tallies_by_season.items():
+                print(f'{season}: {summary_str(tally)}')
+            print()
+
+
+def summary_str(tally):
+    """Return a one-line summary of a tally."""
+    num_predictions = tally.scores.count
+    if not num_predictions:
+        return "no predictions"
+    category_ratio = tally.categories.correct() / num_predictions
+    result_ratio = tally.results.correct() / num_predictions
+    return (
+        f"{num_predictions} predictions, "
+        f"mean points {tally.mean_points():.3f}, "
+        f"guessed category {category_ratio:.2%}, "
+        f"guessed result {result_ratio:.2%}"
+    )
 
-def earliest_latest(match):
-    """Return the earliest start date and latest end date in UTC."""
-
-    region = match.competition.region
 
-    utc_time = match.utc_time
-    if utc_time is not None:
-        earliest_utc_start = utc_time
-        latest_utc_end = utc_time + MAX_DURATION
-    else:
-        date = match.date
-        tzinfo = datetools.TIMEZONES[region]
+def print_backtest_report(windows):
+    """Print a summary of the evaluations from each cutoff date."""
 
-        local_time_early = datetime.datetime.combine(
-            date, football.EARLIEST_START, tzinfo
+    print('# Walk-forward backtest #')
+    print()
+    for cutoff, evaluations in sorted(windows.items()):
+        print(f'## From {cutoff} ##')
+        for evaluation in evaluations:
+            print(f"{evaluation.name!r}: {summary_str(evaluation.total())}")
+        print()
+
+
+def print_interim(evaluations, day):
+    """Print intermediate results of evaluations to stderr."""
+    for evaluation in evaluations:
+        tally = evaluation.total()
+        if not tally.scores.count:
+            continue
+        print(
+            f"Day {day}, {evaluation.name!r}: {tally.scores.count} predictions, "
+            f"mean points {tally.mean_points():.3f}",
+            file=sys.stderr,
         )
-        earliest_start = local_time_early - datetools.MAX_TIME_DIFF[region]
-        earliest_utc_start = datetools.to_utc(earliest_start)
 
-        local_time_late = datetime.datetime.combine(date, football.LATEST_START, tzinfo)
-        latest_end = local_time_late + MAX_DURATION
-        latest_utc_end = datetools.to_utc(latest_end)
 
-    if earliest_utc_start.time() < UTC_DATE_CUTOFF:
-        earliest_start = earliest_utc_start.date() - ONE_DAY
-    else:
-        earliest_start = earliest_utc_start.date()
-
-    if latest_utc_end.time() <= UTC_DATE_CUTOFF:
-        latest_end = latest_utc_end.date() - ONE_DAY
-    else:
-        latest_end = latest_utc_end.date()
-
-    assert earliest_start <= latest_end, "a match can't end before it starts"
-
-    return earliest_start, latest_end
+def get_bias_strs(average_probs, counts, num_predictions, p=DEFAULT_P):
+    """Return strings describing the biases, after doing hypothesis tests."""
+    tails = probtools.binomial_tails(counts, num_predictions, average_probs)
+    return [
+        get_bias_str(count / num_predictions, lower_tail, upper_tail, p)
+        for count, (lower_tail, upper_tail) in zip(counts, tails)
+    ]
 
 
-def get_bias_str(average_prob, count, num_predictions, p=DEFAULT_P):
-    """Return a string describing the bias, after doing a hypothesis test."""
-    true_mean = count / num_predictions
-    if probtools.binomial_cdf(count, num_predictions, average_prob) < p / 2:
+def get_bias_str(true_mean, lower_tail, upper_tail, p=DEFAULT_P):
+    """Return a string describing the bias, given both tail probabilities."""
+    if lower_tail < p / 2:
         return f"overestimate: reality={true_mean:.2%}"
-    if 1 - probtools.binomial_cdf(count - 1, num_predictions, average_prob) < p / 2:
+    if upper_tail < p / 2:
         return f"underestimate: reality={true_mean:.2%}"
     return ''
 
 
+def print_parallel_evaluations(
+    matches, prediction_start, jobs=None, breakdown=False
+):
+    """Evaluate all predictors, each in its own worker process.
+
+    The reports are printed in the same order and with the same content as
+    when evaluating sequentially.  `jobs` is the maximum number of worker
+    processes, by default the number of CPUs."""
+
+    num_predictors = len(predictors.get_all())
+    arguments = [
+        (index, prediction_start, breakdown) for index in range(num_predictors)
+    ]
+    with multiprocessing.Pool(jobs, init_worker, (matches,)) as pool:
+        for report, diagnostics in pool.imap(evaluation_report, arguments):
+            print(report, end='')
+            print(diagnostics, end='', file=sys.stderr)
+
+
+def print_sharded_evaluations(
+    matches, prediction_start, jobs=None, breakdown=False
+):
+    """Evaluate all predictors, with the regions split among worker processes.
+
+    This relies on predictors keeping independent state per region, which
+    all of ours do.  The merged reports are the same as when evaluating
+    sequentially.  `jobs` is the maximum number of worker processes, by
+    default the number of CPUs."""
+
+    shards = collections.defaultdict(list)
+    for match in matches:
+        shards[match.competition.region].append(match)
+    # Start with the largest shards, so that the workers finish together.
+    arguments = [
+        (shard, prediction_start)
+        for shard in sorted(shards.values(), key=len, reverse=True)
+    ]
+
+    evaluations = []
+    with multiprocessing.Pool(jobs) as pool:
+        for shard_evaluations, diagnostics in pool.imap(evaluate_shard, arguments):
+            print(diagnostics, end='', file=sys.stderr)
+            if not evaluations:
+                evaluations = shard_evaluations
+                continue
+            for evaluation, shard_evaluation in zip(evaluations, shard_evaluations):
+                evaluation.merge(shard_evaluation)
+
+    for evaluation in evaluations:
+        print_report(evaluation, breakdown)
+
+
+def evaluate_shard(arguments):
+    """Evaluate all predictors on a shard of matches in a worker process.
+
+    Return the evaluations and the predictors' diagnostics as a string."""
+
+    matches, prediction_start = arguments
+    all_predictors = predictors.get_all()
+    evaluations = evaluate(all_predictors, matches, prediction_start)
+    diagnostics = io.StringIO()
+    for predictor in all_predictors:
+        predictor.print_diagnostics(file=diagnostics)
+    return evaluations, diagnostics.getvalue()
+
+
+def init_worker(matches):
+    """Store the matches in a worker process."""
+    global worker_matches
+    worker_matches = matches
+
+
+def evaluation_report(arguments):
+    """Evaluate a predictor in a worker process and return the output.
+
+    Return the report and the diagnostics as strings."""
+
+    index, prediction_start, breakdown = arguments
+    predictor = predictors.get_all()[index]
+    report = io.StringIO()
+    with contextlib.redirect_stdout(report):
+        print_evaluation(predictor, worker_matches, prediction_start, breakdown)
+    diagnostics = io.StringIO()
+    predictor.print_diagnostics(file=diagnostics)
+    return report.getvalue(), diagnostics.getvalue()
+
+
+def positive_int(value_str):
+    """Return a positive int, given a command line argument."""
+    value = int(value_str)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, is {value}")
+    return value
+
+
+def parse_args():
+    """Return the parsed command line arguments."""
+    parser = argparse.ArgumentParser(description="Evaluate all predictors.")
+    parser.add_argument(
+        '-j',
+        '--jobs',
+        type=positive_int,
+        default=1,
+        help="number of worker processes (default: 1)",
+    )
+    parser.add_argument(
+        '--shard',
+        action='store_true',
+        help="split the regions among the worker processes",
+    )
+    parser.add_argument(
+        '--interim',
+        type=positive_int,
+        metavar='DAYS',
+        help="print intermediate results every DAYS days (only with 1 job)",
+    )
+    parser.add_argument(
+        '--compact',
+        action='store_true',
+        help="hold the history in a compact table, using less memory but more time",
+    )
+    parser.add_argument(
+        '--breakdown',
+        action='store_true',
+        help="also report per region, competition and season",
+    )
+    parser.add_argument(
+        '--cutoffs',
+        nargs='+',
+        type=datetools.date_from_iso,
+        metavar='DATE',
+        help="summarize the predictions from each of these dates (only with 1 job)",
+    )
+    args = parser.parse_args()
+    if args.cutoffs and (args.shard or args.jobs != 1):
+        parser.error("--cutoffs only works with a single job")
+    if args.interim and (args.shard or args.jobs != 1):
+        parser.error("--interim only works with a single job")
+    return args
+
+
 def main():
     """Evaluate all predictors."""
-    matches = data.matches()
-    for predictor in predictors.get_all():
-        print_evaluation(predictor, matches, datetime.date(2016, 7, 20))
+    args = parse_args()
+    if args.compact:
+        matches = data.match_table()
+    elif args.cutoffs or (args.jobs == 1 and not args.shard):
+        # A single walk through the history doesn't need it all at once.
+        matches = data.iter_matches()
+    else:
+        matches = data.matches()
+    if args.cutoffs:
+        all_predictors = predictors.get_all()
+        windows = backtest(all_predictors, matches, args.cutoffs, args.interim)
+        print_backtest_report(windows)
+        for predictor in all_predictors:
+            predictor.print_diagnostics(file=sys.stderr)
+    elif args.shard:
+        print_sharded_evaluations(
+            matches, PREDICTION_START, args.jobs, args.breakdown
+        )
+    elif args.jobs == 1:
+        all_predictors = predictors.get_all()
+        evaluations = evaluate(
+            all_predictors, matches, PREDICTION_START, args.interim
+        )
+        for predictor, evaluation in zip(all_predictors, evaluations):
+            print_report(evaluation, args.breakdown)
+            predictor.print_diagnostics(file=sys.stderr)
+    else:
+        print_parallel_evaluations(
+            matches, PREDICTION_START, args.jobs, args.breakdown
+        )
 
 
 if __name__ == '__main__':
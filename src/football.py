@@ -1,6 +1,7 @@
 """Helpers for representing football matches."""
 
 
+import array
 import datetime
 import functools
 import typing
@@ -14,9 +15,19 @@ EARLIEST_START = datetime.time(9)
 
 LATEST_START = datetime.time.max
 
+# Maximum match duration.
+MAX_DURATION = datetime.timedelta(hours=3)
+
+# For play windows, the date rolls over at this UTC time.
+UTC_DATE_CUTOFF = datetime.time(5)
+
+ONE_DAY = datetime.timedelta(1)
+
 # Earliest start date for summer-to-summer seasons, with a few days in hand.
 SEASON_START_DATE = 7, 1
 
+RESULTS = '1', 'X', '2'
+
 THREE_POINTS_ERA = {
     'argentina': 1995,
     'austria': 1995,
@@ -187,6 +198,343 @@ class Fixture(typing.NamedTuple):
         )
 
 
+class TeamRegistry:
+    """Interned team names, each with a small integer ID."""
+
+    def __init__(self):
+        self.names = []
+        self.ids = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def intern(self, name):
+        """Return the ID of a team, registering the team if it's new."""
+        team_id = self.ids.get(name)
+        if team_id is None:
+            team_id = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return team_id
+
+    def name(self, team_id):
+        """Return the name of a team, given its ID."""
+        return self.names[team_id]
+
+
+# Shared by all tables, so that team IDs can be compared between them.
+TEAMS = TeamRegistry()
+
+# Fields of matches that match tables only load when they're first needed.
+STAT_FIELDS = tuple(
+    name
+    for name in Match._fields[Match._fields.index('utc_time') + 1 :]
+    if name not in ('stage', 'forfeited')
+)
+
+# Stored instead of None in optional columns.
+MISSING = -1
+MISSING_TIME = -(2 ** 63)
+MISSING_STAT = -(2 ** 15)
+
+EPOCH = datetime.datetime(1970, 1, 1)
+
+
+class MatchTable:
+    """Matches stored column by column in compact arrays.
+
+    Teams are stored as IDs in a team registry, dates as ordinals and goals as
+    bytes.  Indexing and iterating yield `MatchView` rows, which behave like
+    matches without copying their data.  The statistics columns are loaded
+    from `stats_loader`, which must yield the same matches in the same order,
+    when they're first used; without a loader, they're stored right away."""
+
+    def __init__(self, stats_loader=None, teams=TEAMS):
+        self.teams = teams
+        self.stats_loader = stats_loader
+        self.competitions = []
+        self.competition_ids = {}
+        self.competition_column = array.array('h')
+        self.dates = array.array('i')
+        self.seasons = array.array('h')
+        self.homes = array.array('i')
+        self.aways = array.array('i')
+        self.home_goals = array.array('b')
+        self.away_goals = array.array('b')
+        self.utc_times = array.array('q')
+        self.stages = array.array('h')
+        self.forfeited = array.array('b')
+        # Field name -> array, or None until they're loaded.
+        self.stats = None if stats_loader else empty_stats()
+        # Shared objects, by the values stored for them.
+        self.date_objects = {}
+        self.season_objects = {}
+        self.stage_names = []
+        self.stage_ids = {}
+
+    @classmethod
+    def from_matches(cls, matches, stats_loader=None, teams=TEAMS):
+        """Return a table of matches."""
+        table = cls(stats_loader, teams)
+        for match in matches:
+            table.append(match)
+        return table
+
+    def __len__(self):
+        return len(self.dates)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [MatchView(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("match table index out of range")
+        return MatchView(self, index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield MatchView(self, index)
+
+    def append(self, match):
+        """Add a match."""
+
+        competition_id = self.competition_ids.get(match.competition)
+        if competition_id is None:
+            competition_id = len(self.competitions)
+            self.competition_ids[match.competition] = competition_id
+            self.competitions.append(match.competition)
+        self.competition_column.append(competition_id)
+
+        ordinal = match.date.toordinal()
+        self.date_objects.setdefault(ordinal, match.date)
+        self.dates.append(ordinal)
+        season_code = match.season.start * 2 + match.season.ends_following_year
+        self.season_objects.setdefault(season_code, match.season)
+        self.seasons.append(season_code)
+
+        self.homes.append(self.teams.intern(match.home))
+        self.aways.append(self.teams.intern(match.away))
+        self.home_goals.append(match.home_goals)
+        self.away_goals.append(match.away_goals)
+
+        if match.utc_time is None:
+            self.utc_times.append(MISSING_TIME)
+        else:
+            seconds = (match.utc_time - EPOCH) // datetime.timedelta(seconds=1)
+            self.utc_times.append(seconds)
+        stage_id = self.stage_ids.get(match.stage)
+        if stage_id is None:
+            stage_id = self.stage_ids[match.stage] = len(self.stage_names)
+            self.stage_names.append(match.stage)
+        self.stages.append(stage_id)
+        self.forfeited.append(MISSING if match.forfeited is None else match.forfeited)
+
+        if self.stats is not None:
+            append_stats(self.stats, match)
+
+    def stat(self, name, index):
+        """Return a statistic of a match, loading the statistics if needed."""
+        if self.stats is None:
+            self.load_stats()
+        value = self.stats[name][index]
+        return None if value == MISSING_STAT else value
+
+    def load_stats(self):
+        """Load the statistics columns."""
+        stats = empty_stats()
+        for match in self.stats_loader():
+            append_stats(stats, match)
+        if len(stats[STAT_FIELDS[0]]) != len(self):
+            raise ValueError("statistics don't fit the matches")
+        self.stats = stats
+
+    def to_match(self, index):
+        """Return a row as a match."""
+        view = MatchView(self, index)
+        return Match(*(getattr(view, name) for name in Match._fields))
+
+
+def empty_stats():
+    """Return empty statistics columns."""
+    return {name: array.array('h') for name in STAT_FIELDS}
+
+
+def append_stats(stats, match):
+    """Add the statistics of a match to statistics columns."""
+    for name, column in stats.items():
+        value = getattr(match, name)
+        column.append(MISSING_STAT if value is None else value)
+
+
+@functools.total_ordering
+class MatchView:
+    """A row of a match table, which behaves like a match.
+
+    Pickling a view stores it as a `Match`."""
+
+    __slots__ = 'table', 'index'
+
+    def __init__(self, table, index):
+        self.table = table
+        self.index = index
+
+    @property
+    def competition(self):
+        table = self.table
+        return table.competitions[table.competition_column[self.index]]
+
+    @property
+    def date(self):
+        table = self.table
+        return table.date_objects[table.dates[self.index]]
+
+    @property
+    def season(self):
+        table = self.table
+        return table.season_objects[table.seasons[self.index]]
+
+    @property
+    def home(self):
+        table = self.table
+        return table.teams.names[table.homes[self.index]]
+
+    @property
+    def away(self):
+        table = self.table
+        return table.teams.names[table.aways[self.index]]
+
+    @property
+    def home_goals(self):
+        return self.table.home_goals[self.index]
+
+    @property
+    def away_goals(self):
+        return self.table.away_goals[self.index]
+
+    @property
+    def utc_time(self):
+        seconds = self.table.utc_times[self.index]
+        if seconds == MISSING_TIME:
+            return None
+        return EPOCH + datetime.timedelta(seconds=seconds)
+
+    @property
+    def stage(self):
+        table = self.table
+        return table.stage_names[table.stages[self.index]]
+
+    @property
+    def forfeited(self):
+        value = self.table.forfeited[self.index]
+        return None if value == MISSING else bool(value)
+
+    @property
+    def score(self):
+        """The full time score of the match."""
+        return self.home_goals, self.away_goals
+
+    def __getattr__(self, name):
+        if name in STAT_FIELDS:
+            return self.table.stat(name, self.index)
+        raise AttributeError(f"{type(self).__name__!r} has no attribute {name!r}")
+
+    def to_match(self):
+        """Return the row as a match."""
+        return self.table.to_match(self.index)
+
+    def _asdict(self):
+        return self.to_match()._asdict()
+
+    def _replace(self, **kwargs):
+        return self.to_match()._replace(**kwargs)
+
+    def __iter__(self):
+        return iter(self.to_match())
+
+    def __len__(self):
+        return len(Match._fields)
+
+    def __getitem__(self, index):
+        return self.to_match()[index]
+
+    def __eq__(self, other):
+        if isinstance(other, MatchView):
+            other = other.to_match()
+        return self.to_match() == other
+
+    def __lt__(self, other):
+        if isinstance(other, MatchView):
+            other = other.to_match()
+        return self.to_match() < other
+
+    def __hash__(self):
+        return hash(self.to_match())
+
+    def __repr__(self):
+        return repr(self.to_match())
+
+    def __reduce__(self):
+        return Match, tuple(self.to_match())
+
+
+def play_window(match):
+    """Return the earliest start date and latest end date in UTC.
+
+    Dates roll over at `UTC_DATE_CUTOFF`, and matches without a known time
+    are assumed to be played on their local date."""
+
+    region = match.competition.region
+
+    utc_time = match.utc_time
+    if utc_time is not None:
+        earliest_utc_start = utc_time
+        latest_utc_end = utc_time + MAX_DURATION
+    else:
+        date = match.date
+        tzinfo = datetools.TIMEZONES[region]
+
+        local_time_early = datetime.datetime.combine(date, EARLIEST_START, tzinfo)
+        earliest_start = local_time_early - datetools.MAX_TIME_DIFF[region]
+        earliest_utc_start = datetools.to_utc(earliest_start)
+
+        local_time_late = datetime.datetime.combine(date, LATEST_START, tzinfo)
+        latest_end = local_time_late + MAX_DURATION
+        latest_utc_end = datetools.to_utc(latest_end)
+
+    if earliest_utc_start.time() < UTC_DATE_CUTOFF:
+        earliest_start = earliest_utc_start.date() - ONE_DAY
+    else:
+        earliest_start = earliest_utc_start.date()
+
+    if latest_utc_end.time() <= UTC_DATE_CUTOFF:
+        latest_end = latest_utc_end.date() - ONE_DAY
+    else:
+        latest_end = latest_utc_end.date()
+
+    assert earliest_start <= latest_end, "a match can't end before it starts"
+
+    return earliest_start, latest_end
+
+
+def play_window_settings():
+    """Return a description of the settings that play windows depend on."""
+    settings = (
+        EARLIEST_START,
+        LATEST_START,
+        MAX_DURATION,
+        UTC_DATE_CUTOFF,
+        sorted(datetools.TIMEZONES.items()),
+        sorted(datetools.MAX_TIME_DIFF.items()),
+    )
+    return repr(settings)
+
+
+def play_window_offsets(match):
+    """Return the play window as offsets in days from the match's local date."""
+    earliest_start, latest_end = play_window(match)
+    return (earliest_start - match.date).days, (latest_end - match.date).days
+
+
 def result(score):
     """Return 1, X or 2."""
     home, away = score
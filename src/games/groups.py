@@ -18,6 +18,8 @@ CUPS = [football.Competition('europe', 'champions')]
 
 def get_team_chances(matches, fixtures, played, competition, season, get_predictor):
     """Return the counts per position per team."""
+    predictor = simulate.fed_predictor(matches, fixtures, get_predictor)
+    category_to_score = simulate.get_category_to_score(matches)
     random.seed(0)
     # Group -> team -> position -> count
     counters = collections.defaultdict(
@@ -26,12 +28,12 @@ def get_team_chances(matches, fixtures, played, competition, season, get_predict
     for i in range(NUM_SIMULATIONS):
         print(f"# Simulation {i} #", file=sys.stderr)
         simulated = simulate.simulate_season(
-            matches,
             fixtures,
             played,
             competition,
             season,
-            get_predictor(),
+            predictor.clone(),
+            category_to_score,
             restrict=True,
         )
         matches_by_group, _ = simulate.order_cup_matches([*played, *simulated])
@@ -76,15 +78,12 @@ def play():
 
     season = football.current_season()
     matches = data.matches()
+    index = data.MatchIndex(matches)
     get_predictor = predictors.strengths.Predictor
 
     for competition in CUPS:
         fixtures = list(data.season_fixtures(competition, season))
-        played = [
-            match
-            for match in matches
-            if match.competition == competition and match.season == season
-        ]
+        played = index.season_matches(competition, season)
         team_chances = get_team_chances(
             matches, fixtures, played, competition, season, get_predictor
         )
@@ -17,12 +17,19 @@ NUM_SIMULATIONS = 1000
 
 def get_team_chances(matches, fixtures, played, competition, season, get_predictor):
     """Return the counts per position per team."""
+    predictor = simulate.fed_predictor(matches, fixtures, get_predictor)
+    category_to_score = simulate.get_category_to_score(matches)
     random.seed(0)
     counters = collections.defaultdict(collections.Counter)
     for i in range(NUM_SIMULATIONS):
         print(f"# Simulation {i} #", file=sys.stderr)
         table = simulate.table(
-            matches, fixtures, played, competition, season, get_predictor()
+            fixtures,
+            played,
+            competition,
+            season,
+            predictor.clone(),
+            category_to_score,
         )
         simulate.print_ranking(table, file=sys.stderr)
         for position, team in enumerate(table, 1):
@@ -61,15 +68,12 @@ def play():
 
     season = football.current_season()
     matches = data.matches()
+    index = data.MatchIndex(matches)
     get_predictor = predictors.strengths.Predictor
 
     for competition in prediction_zone.COMPETITIONS:
         fixtures = list(data.season_fixtures(competition, season))
-        played = [
-            match
-            for match in matches
-            if match.competition == competition and match.season == season
-        ]
+        played = index.season_matches(competition, season)
         team_chances = get_team_chances(
             matches, fixtures, played, competition, season, get_predictor
         )
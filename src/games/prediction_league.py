@@ -1,7 +1,6 @@
 """Resources to play in the prediction league."""
 
 
-import collections
 import datetime
 import random
 import sys
@@ -12,6 +11,7 @@ import football
 import predictors
 import probtools
 from games import prediction_zone
+from predictors import snapshots
 
 
 TIMEFRAME = datetime.timedelta(days=21)
@@ -28,8 +28,7 @@ def make_predictions(matches, fixtures, competition, predictor):
     if not fixtures:
         return
 
-    for match in matches:
-        predictor.feed_match(match)
+    snapshots.fed(predictor, matches)
 
     season = fixtures[0].season
     league_size = prediction_zone.get_league_size(competition, season)
@@ -44,14 +43,15 @@ def make_predictions(matches, fixtures, competition, predictor):
             file=sys.stderr,
         )
         prediction_zone.predict_result(fixture, predicted_result)
+    predictor.print_diagnostics(file=sys.stderr)
     print()
 
 
 def get_result_probabilities(probabilities):
     """Return a probability for each result."""
-    result_probabilities = collections.defaultdict(float)
-    for category, probability in probabilities.items():
-        result_probabilities[football.result(category)] += probability
+    result_probabilities = dict(
+        zip(football.RESULTS, probabilities.result_probabilities())
+    )
     if not probtools.is_distribution(result_probabilities.values()):
         print("Fishy probabilities.", file=sys.stderr)
     return result_probabilities
@@ -11,6 +11,7 @@ import predictors
 import probtools
 import simulate
 from games import prediction_zone
+from predictors import snapshots
 
 
 TIMEFRAME = datetime.timedelta(days=21)
@@ -19,8 +20,7 @@ TIMEFRAME = datetime.timedelta(days=21)
 def make_predictions(matches, fixtures, predictor):
     """Make some predictions and upload them."""
 
-    for match in matches:
-        predictor.feed_match(match)
+    snapshots.fed(predictor, matches)
 
     category_to_score = simulate.get_category_to_score(matches)
 
@@ -34,6 +34,7 @@ def make_predictions(matches, fixtures, predictor):
             file=sys.stderr,
         )
         prediction_zone.predict_score(fixture, predicted_score)
+    predictor.print_diagnostics(file=sys.stderr)
     print()
 
 
@@ -98,13 +98,20 @@ def buy_sets(competition, season):
 
 def get_team_values(matches, fixtures, played, competition, season, get_predictor):
     """Return the average values per team."""
+    predictor = simulate.fed_predictor(matches, fixtures, get_predictor)
+    category_to_score = simulate.get_category_to_score(matches)
     random.seed(0)
     totals = collections.defaultdict(int)
     mins = collections.defaultdict(lambda: math.inf)
     for i in range(1, NUM_SIMULATIONS+1):
         print(f"# Simulation {i} #", file=sys.stderr)
         table = simulate.table(
-            matches, fixtures, played, competition, season, get_predictor()
+            fixtures,
+            played,
+            competition,
+            season,
+            predictor.clone(),
+            category_to_score,
         )
         simulate.print_ranking(table, file=sys.stderr)
         values = dict(zip(table, VALUES[competition]))
@@ -154,16 +161,13 @@ def play():
 
     season = football.current_season()
     matches = data.matches()
+    index = data.MatchIndex(matches)
     get_predictor = predictors.strengths.Predictor
 
     for competition in prediction_zone.COMPETITIONS:
         buy_sets(competition, season)
         fixtures = list(data.season_fixtures(competition, season))
-        played = [
-            match
-            for match in matches
-            if (match.competition == competition and match.season == season)
-        ]
+        played = index.season_matches(competition, season)
         mins, team_values = get_team_values(
             matches, fixtures, played, competition, season, get_predictor
         )
@@ -10,6 +10,8 @@ import pathlib
 HERE = pathlib.Path(os.path.realpath(__file__)).parent
 DATA_DIR = HERE.parent / 'data'
 CONSOLIDATED_DIR = DATA_DIR / 'consolidated'
+SNAPSHOTS_DIR = DATA_DIR / 'snapshots'
+SWEEP_PATH = DATA_DIR / 'sweep.csv'
 
 
 def stem(path):
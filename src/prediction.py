@@ -1,18 +1,47 @@
 """Resources related to prediction."""
 
 
+import collections.abc
 import functools
+import math
+
+import football
 
 
 MAX_GOALS = 7
 MAX_BASE = MAX_GOALS // 2
 
+# Size of the score lookup tables, per team.  Scores with more goals are
+# categorized the slow way.
+TABLE_GOALS = 16
+
 
 def category(match):
     """Return a score category, given a match."""
     return category_from_score(match.score)
 
 
+def category_id(match):
+    """Return the ID of a match's score category."""
+    return category_id_from_goals(match.home_goals, match.away_goals)
+
+
+def category_id_from_goals(home_goals, away_goals):
+    """Return the ID of a score category, given the goals of both teams."""
+    try:
+        return category_id_table()[home_goals][away_goals]
+    except IndexError:
+        return category_ids()[category_from_score((home_goals, away_goals))]
+
+
+def result_id_from_goals(home_goals, away_goals):
+    """Return the index in `football.RESULTS` of a score's result."""
+    try:
+        return result_id_table()[home_goals][away_goals]
+    except IndexError:
+        return football.RESULTS.index(football.result((home_goals, away_goals)))
+
+
 def category_from_score(score):
     """Return a score category, given a score."""
     home, away = score
@@ -52,3 +81,91 @@ def category_to_str(match_category):
     home, away = match_category
     sep = ':' if home + away < MAX_GOALS - 1 else '~'
     return f'{home}{sep}{away}'
+
+
+@functools.lru_cache()
+def category_ids():
+    """Return a mapping from categories to IDs, their indices in `categories()`."""
+    return {category: i for i, category in enumerate(categories())}
+
+
+@functools.lru_cache()
+def result_ids():
+    """Return the index in `football.RESULTS` for each category ID."""
+    return [
+        football.RESULTS.index(football.result(category)) for category in categories()
+    ]
+
+
+@functools.lru_cache()
+def category_id_table():
+    """Return a table of category IDs, indexed by home goals and away goals."""
+    ids = category_ids()
+    return [
+        [ids[category_from_score((home, away))] for away in range(TABLE_GOALS)]
+        for home in range(TABLE_GOALS)
+    ]
+
+
+@functools.lru_cache()
+def result_id_table():
+    """Return a table of result IDs, indexed by home goals and away goals."""
+    return [
+        [
+            football.RESULTS.index(football.result((home, away)))
+            for away in range(TABLE_GOALS)
+        ]
+        for home in range(TABLE_GOALS)
+    ]
+
+
+class ProbabilityVector(collections.abc.Mapping):
+    """A probability for each category, stored in the order of `categories()`.
+
+    Can be used like a mapping from categories to probabilities."""
+
+    __slots__ = ('probabilities',)
+
+    def __init__(self, probabilities):
+        self.probabilities = probabilities
+
+    def __getitem__(self, category):
+        return self.probabilities[category_ids()[category]]
+
+    def __iter__(self):
+        return iter(categories())
+
+    def __len__(self):
+        return len(self.probabilities)
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.probabilities!r})'
+
+    def values(self):
+        return self.probabilities
+
+    def items(self):
+        return zip(categories(), self.probabilities)
+
+    def result_probabilities(self):
+        """Return a probability for each result, in the order of `RESULTS`."""
+        result = [0.0] * len(football.RESULTS)
+        for result_id, probability in zip(result_ids(), self.probabilities):
+            result[result_id] += probability
+        return result
+
+    def most_likely_id(self):
+        """Return the most likely category ID, the first one if there is a tie."""
+        probabilities = self.probabilities
+        return max(range(len(probabilities)), key=probabilities.__getitem__)
+
+    def most_likely_result_id(self):
+        """Return the most likely result ID, the first one if there is a tie."""
+        result_probabilities = self.result_probabilities()
+        indices = range(len(result_probabilities))
+        return max(indices, key=result_probabilities.__getitem__)
+
+    def log_likelihood(self, category_id):
+        """Return the natural logarithm of a category's probability."""
+        probability = self.probabilities[category_id]
+        return math.log(probability) if probability > 0 else -math.inf
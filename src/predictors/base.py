@@ -2,6 +2,8 @@
 
 
 import abc
+import copy
+import sys
 
 
 class Predictor(abc.ABC):
@@ -15,6 +17,35 @@ class Predictor(abc.ABC):
     def feed_match(self, match):
         """Add a match to the database."""
 
+    def feed_matches(self, matches):
+        """Add several matches to the database."""
+        for match in matches:
+            self.feed_match(match)
+
     @abc.abstractmethod
     def predict(self, fixture):
-        """Predict a match."""
+        """Predict a match.
+
+        Return a `prediction.ProbabilityVector`."""
+
+    def predict_many(self, fixtures):
+        """Predict several matches, without feeding any matches in between.
+
+        Return a list with one `prediction.ProbabilityVector` per fixture."""
+
+        return [self.predict(fixture) for fixture in fixtures]
+
+    def prepare(self, date):
+        """Precompute what predictions on or after a date start from.
+
+        The default implementation does nothing."""
+
+    def clone(self):
+        """Return an independent copy of the predictor.
+
+        Subclasses may share state between the copies until it's modified."""
+
+        return copy.deepcopy(self)
+
+    def print_diagnostics(self, file=sys.stdout):
+        """Print diagnostic information, if there is any."""
@@ -2,7 +2,10 @@
 
 
 import collections
+import copy
 import datetime
+import itertools
+import operator
 
 import datetools
 import prediction
@@ -17,24 +20,83 @@ class Predictor(base.Predictor):
 
     def __init__(self, name='simple', *args, **kwargs):
         super().__init__(name, *args, **kwargs)
-        self.category_counts = collections.defaultdict(collections.Counter)
-        self.memory = collections.deque()
+        # Competition -> queue of (date ordinal, category ID) pairs.
+        self.memory = {}
+        # Competition -> list of counts, indexed by category ID.
+        self.category_counts = {}
+        # Competition -> probability vector, until the counts change.
+        self.prediction_caches = {}
+        # Competitions whose memory and counts are shared with clones, and
+        # must be copied before they're modified.
+        self.shared = set()
 
     def feed_match(self, match):
-        category = prediction.category(match)
-        self.category_counts[match.competition][category] += 1
-        self.memory.append(match)
+        competition = match.competition
+        memory, counts = self.own(competition)
+        category_id = prediction.category_id(match)
+        memory.append((match.date.toordinal(), category_id))
+        counts[category_id] += 1
+        self.prediction_caches.pop(competition, None)
+
+    def feed_matches(self, matches):
+        groups = itertools.groupby(matches, key=operator.attrgetter('competition'))
+        for competition, competition_matches in groups:
+            memory, counts = self.own(competition)
+            for match in competition_matches:
+                category_id = prediction.category_id(match)
+                memory.append((match.date.toordinal(), category_id))
+                counts[category_id] += 1
+            self.prediction_caches.pop(competition, None)
 
     def predict(self, fixture):
-        date = fixture.date
-        while self.memory and date - self.memory[0].date > KEEP_MATCHES:
-            match = self.memory.popleft()
-            category = prediction.category(match)
-            self.category_counts[match.competition][category] -= 1
-
-        counts = self.category_counts[fixture.competition]
-        adjusted_counts = {
-            category: max(counts[category], 1) for category in prediction.categories()
-        }
-        total = sum(adjusted_counts.values())
-        return {category: count / total for category, count in adjusted_counts.items()}
+        competition = fixture.competition
+        self.expire(competition, fixture.date)
+
+        probabilities = self.prediction_caches.get(competition)
+        if probabilities is None:
+            counts = self.category_counts.get(competition)
+            if counts is None:
+                counts = [0] * prediction.num_categories()
+            adjusted_counts = [max(count, 1) for count in counts]
+            total = sum(adjusted_counts)
+            probabilities = prediction.ProbabilityVector(
+                [count / total for count in adjusted_counts]
+            )
+            self.prediction_caches[competition] = probabilities
+        return probabilities
+
+    def expire(self, competition, date):
+        """Forget a competition's matches that are too old for a date."""
+
+        memory = self.memory.get(competition)
+        cutoff = date.toordinal() - KEEP_MATCHES.days
+        if not memory or memory[0][0] >= cutoff:
+            return
+
+        memory, counts = self.own(competition)
+        while memory and memory[0][0] < cutoff:
+            _, category_id = memory.popleft()
+            counts[category_id] -= 1
+        self.prediction_caches.pop(competition, None)
+
+    def clone(self):
+        self.shared.update(self.memory)
+        other = copy.copy(self)
+        other.memory = dict(self.memory)
+        other.category_counts = dict(self.category_counts)
+        # Cached predictions are replaced, never modified.
+        other.prediction_caches = dict(self.prediction_caches)
+        other.shared = set(self.shared)
+        return other
+
+    def own(self, competition):
+        """Return the memory and counts, copying them first if they're shared."""
+
+        if competition in self.shared:
+            self.shared.discard(competition)
+            self.memory[competition] = self.memory[competition].copy()
+            self.category_counts[competition] = self.category_counts[competition].copy()
+        elif competition not in self.memory:
+            self.memory[competition] = collections.deque()
+            self.category_counts[competition] = [0] * prediction.num_categories()
+        return self.memory[competition], self.category_counts[competition]
@@ -0,0 +1,157 @@
+"""Snapshots of fed predictors, stored on disk."""
+
+
+import bisect
+import datetime
+import hashlib
+import os
+import pickle
+import sys
+
+import data
+import paths
+
+
+# Increase this whenever the state of a predictor changes incompatibly.
+VERSION = 6
+
+# The latest matches are left out of snapshots because their data may still
+# change, and because later runs only have to agree on the snapshotted part.
+MARGIN = datetime.timedelta(days=14)
+
+
+def fed(predictor, matches):
+    """Feed all matches to a fresh predictor, restoring a snapshot if possible.
+
+    `matches` must be sorted by date.  Only the matches that are newer than a
+    valid snapshot are fed.  The snapshot is brought up to date in between,
+    after the predictor has been prepared for predictions from then on."""
+
+    if not matches:
+        return predictor
+
+    config = config_digest(predictor)
+    path = snapshot_path(predictor)
+    cutoff = matches[-1].date - MARGIN
+    stable_count = bisect.bisect_left([match.date for match in matches], cutoff)
+    # Checking the CSV files is quicker than hashing the matches, and enough
+    # as long as they're unchanged.
+    stamp = data.matches_stamp({match.competition for match in matches})
+    fingerprint = hashlib.sha256()
+    hashed_count = 0
+
+    fed_count = 0
+    snapshot = load(path)
+    if (
+        snapshot is not None
+        and snapshot['config'] == config
+        and snapshot['count'] <= stable_count
+    ):
+        count = snapshot['count']
+        if stamp is not None and snapshot['stamp'] == stamp:
+            fed_count = count
+        else:
+            update_fingerprint(fingerprint, matches, 0, count)
+            if fingerprint.hexdigest() == snapshot['fingerprint']:
+                fed_count = hashed_count = count
+            else:
+                fingerprint = hashlib.sha256()
+        if fed_count:
+            predictor.__dict__.update(snapshot['state'])
+
+    if fed_count < stable_count:
+        predictor.feed_matches(matches[fed_count:stable_count])
+        predictor.prepare(cutoff)
+    if fed_count < stable_count or (fed_count and snapshot['stamp'] != stamp):
+        update_fingerprint(fingerprint, matches, hashed_count, stable_count)
+        save(path, config, stable_count, stamp, fingerprint.hexdigest(), predictor)
+
+    predictor.feed_matches(matches[stable_count:])
+    return predictor
+
+
+def update_fingerprint(fingerprint, matches, start, stop):
+    """Add the relevant data of some matches to a hash object."""
+    for match in matches[start:stop]:
+        region, name = match.competition
+        fingerprint.update(
+            f'{region},{name},{match.date},{match.home},{match.away},'
+            f'{match.home_goals},{match.away_goals}\n'.encode()
+        )
+
+
+def config_digest(predictor):
+    """Return a digest identifying the predictor's class and settings.
+
+    The predictor must not have been fed yet."""
+
+    return hashlib.sha256(pickle.dumps(predictor)).hexdigest()
+
+
+def snapshot_path(predictor):
+    """Return the path of a predictor's snapshot file."""
+    name = predictor.name.replace(' ', '-')
+    return paths.SNAPSHOTS_DIR / f'{name}.pickle'
+
+
+def load(path):
+    """Return the stored snapshot, or None if there is no usable one."""
+
+    try:
+        file = open(path, 'rb')
+    except FileNotFoundError:
+        return None
+    except OSError as exc:
+        print("Couldn't open snapshot file:", exc, file=sys.stderr)
+        return None
+
+    with file:
+        try:
+            snapshot = pickle.load(file)
+        except (
+            pickle.UnpicklingError,
+            AttributeError,
+            EOFError,
+            ImportError,
+            IndexError,
+            TypeError,
+            ValueError,
+        ) as exc:
+            print("Couldn't read snapshot file:", exc, file=sys.stderr)
+            return None
+
+    if not isinstance(snapshot, dict) or snapshot.get('version') != VERSION:
+        return None
+    return snapshot
+
+
+def save(path, config, count, stamp, fingerprint, predictor):
+    """Store a snapshot of a predictor that has been fed `count` matches.
+
+    `stamp` identifies the CSV files the matches were read from, and
+    `fingerprint` the matches themselves."""
+
+    snapshot = {
+        'version': VERSION,
+        'config': config,
+        'count': count,
+        'stamp': stamp,
+        'fingerprint': fingerprint,
+        'state': predictor.__dict__,
+    }
+
+    temporary_path = path.with_name(path.name + '.tmp')
+    try:
+        paths.SNAPSHOTS_DIR.mkdir(exist_ok=True)
+        file = open(temporary_path, 'wb')
+    except OSError as exc:
+        print("Couldn't open snapshot file to write to:", exc, file=sys.stderr)
+        return
+
+    with file:
+        pickle.dump(snapshot, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    try:
+        os.replace(temporary_path, path)
+    except OSError as exc:
+        print("Couldn't replace snapshot file:", exc, file=sys.stderr)
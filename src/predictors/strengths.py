@@ -2,9 +2,15 @@
 
 
 import collections
+import copy
 import datetime
+import functools
+import itertools
 import math
+import operator
 import sys
+import time
+import typing
 
 import datetools
 import football
@@ -12,55 +18,215 @@ import prediction
 from predictors import base
 
 
-HOME_ADVANTAGE = 0.43
+class Parameters(typing.NamedTuple):
+    """Tunable constants of the strength model."""
 
-ITERATIONS = range(100)
-ITERATIONS_UPDATE = range(5)
+    # Strength bonus of the home team.
+    home_advantage: float = 0.43
+    # Strength change per goal of difference and per strength of difference.
+    goal_factor: float = 0.05
+    strength_factor: float = 0.046
+    # A match that is `days` days old weighs base ** days ** exponent.
+    devaluation_base: float = 0.88
+    devaluation_exponent: float = 0.45
+    # The draw probability is peak * exp(-(width * strength diff) ** 2 / 2).
+    draw_peak: float = 0.29
+    draw_width: float = 0.65
+
+
+DEFAULT_PARAMETERS = Parameters()
+
+# Caps on the number of iterations when building a cache from scratch and
+# when updating an existing cache.
+MAX_ITERATIONS = 100
+MAX_ITERATIONS_UPDATE = 5
+
+# Maximum strength change at which the strengths count as converged.
+TOLERANCE = 1e-7
 
 KEEP_MATCHES = datetime.timedelta(days=round(10 * datetools.DAYS_PER_YEAR))
 
+DEFAULT_SOLVER = 'arrays'
+
 
 class Predictor(base.Predictor):
     """A prediction strategy based on modeling teams' strengths."""
 
-    def __init__(self, name='strength model', *args, **kwargs):
+    def __init__(
+        self,
+        name='strength model',
+        *args,
+        solver=DEFAULT_SOLVER,
+        tolerance=TOLERANCE,
+        max_iterations=MAX_ITERATIONS,
+        max_iterations_update=MAX_ITERATIONS_UPDATE,
+        parameters=DEFAULT_PARAMETERS,
+        **kwargs,
+    ):
         super().__init__(name, *args, **kwargs)
+        if solver not in SOLVERS:
+            raise ValueError(f"unknown solver {solver!r}")
+        self.solver = solver
+        self.tolerance = tolerance
+        self.max_iterations = max_iterations
+        self.max_iterations_update = max_iterations_update
+        self.parameters = parameters
+        # (Region, 'cold' or 'warm') -> statistic -> value, for diagnostics.
+        # Cold updates build a region's strengths from scratch, warm updates
+        # start from its cached strengths.
+        self.solver_stats = collections.defaultdict(collections.Counter)
         self.memory = collections.defaultdict(collections.deque)
         self.category_counts = collections.defaultdict(collections.Counter)
         self.valid_caches = set()
         self.strengths_caches = {}
+        # Regions whose next update of cached strengths solves until they
+        # converge, see `prepare`.
+        self.full_updates = set()
+        # Competition -> category factors, see `category_factors`.
+        self.factor_caches = {}
+        # Regions and competitions whose memory and category counts are
+        # shared with clones, and must be copied before they're modified.
+        self.shared_memory = set()
+        self.shared_counts = set()
 
     def feed_match(self, match):
         region = match.competition.region
-        self.memory[region].append(match)
+        self.own_memory(region).append(match)
         self.valid_caches.discard(region)
-        category = prediction.category(match)
-        self.category_counts[match.competition][category] += 1
+        category_id = prediction.category_id(match)
+        self.own_counts(match.competition)[category_id] += 1
+
+    def feed_matches(self, matches):
+        matches_by_region = collections.defaultdict(list)
+        for match in matches:
+            matches_by_region[match.competition.region].append(match)
+        for region, region_matches in matches_by_region.items():
+            self.own_memory(region).extend(region_matches)
+            self.valid_caches.discard(region)
+            groups = itertools.groupby(
+                region_matches, key=operator.attrgetter('competition')
+            )
+            for competition, competition_matches in groups:
+                category_ids = map(prediction.category_id, competition_matches)
+                self.own_counts(competition).update(category_ids)
+
+    def clone(self):
+        other = copy.copy(self)
+        self.shared_memory.update(self.memory)
+        self.shared_counts.update(self.category_counts)
+        other.shared_memory = set(self.shared_memory)
+        other.shared_counts = set(self.shared_counts)
+        other.memory = collections.defaultdict(collections.deque, self.memory)
+        other.category_counts = collections.defaultdict(
+            collections.Counter, self.category_counts
+        )
+        other.valid_caches = set(self.valid_caches)
+        other.full_updates = set(self.full_updates)
+        # The cached strengths and factors are replaced, never modified, so
+        # they can be shared as they are.
+        other.strengths_caches = dict(self.strengths_caches)
+        other.factor_caches = dict(self.factor_caches)
+        other.solver_stats = collections.defaultdict(collections.Counter)
+        for key, stats in self.solver_stats.items():
+            other.solver_stats[key] = stats.copy()
+        return other
+
+    def own_memory(self, region):
+        """Return the memory of a region, copying it first if it's shared."""
+        if region in self.shared_memory:
+            self.shared_memory.discard(region)
+            self.memory[region] = self.memory[region].copy()
+        return self.memory[region]
+
+    def own_counts(self, competition):
+        """Return the category counts, copying them first if they're shared.
+
+        Also invalidates the cached category factors, as the counts are about
+        to change."""
+
+        self.factor_caches.pop(competition, None)
+        if competition in self.shared_counts:
+            self.shared_counts.discard(competition)
+            self.category_counts[competition] = self.category_counts[
+                competition
+            ].copy()
+        return self.category_counts[competition]
 
     def predict(self, fixture, verbose=False):
-        region = fixture.competition.region
-        self.update_cache(region, fixture.date, verbose)
-        strengths = self.strengths_caches[region]
-        strength_diff_naive = strengths[fixture.home] - strengths[fixture.away]
-        strength_diff = strength_diff_naive + HOME_ADVANTAGE
-        result_probabilities = {}
-        draw = 0.29 * math.exp(-0.5 * (strength_diff * 0.65) ** 2)
-        home = (1 - draw) / (1 + math.exp(-strength_diff))
-        result_probabilities = {'1': home, 'X': draw, '2': 1 - home - draw}
-        probabilities = {}
-        counts = self.category_counts[fixture.competition]
-        adjusted_counts = {
-            category: max(counts[category], 1) for category in prediction.categories()
-        }
-        result_counts = collections.Counter()
-        for category, count in adjusted_counts.items():
-            result_counts[football.result(category)] += count
-        for category in prediction.categories():
-            result = football.result(category)
-            factor = adjusted_counts[category] / result_counts[result]
-            probabilities[category] = result_probabilities[result] * factor
+        (probabilities,) = self.predict_many([fixture], verbose)
         return probabilities
 
+    def predict_many(self, fixtures, verbose=False):
+        parameters = self.parameters
+        strength_diffs = []
+        for fixture in fixtures:
+            region = fixture.competition.region
+            self.update_cache(region, fixture.date, verbose)
+            strengths = self.strengths_caches[region]
+            strength_diff_naive = strengths[fixture.home] - strengths[fixture.away]
+            strength_diffs.append(strength_diff_naive + parameters.home_advantage)
+
+        draw_peak = parameters.draw_peak
+        draw_width = parameters.draw_width
+        draws = [
+            draw_peak * math.exp(-0.5 * (strength_diff * draw_width) ** 2)
+            for strength_diff in strength_diffs
+        ]
+        homes = [
+            (1 - draw) / (1 + math.exp(-strength_diff))
+            for strength_diff, draw in zip(strength_diffs, draws)
+        ]
+
+        rows = []
+        for fixture, home, draw in zip(fixtures, homes, draws):
+            result_probabilities = home, draw, 1 - home - draw
+            factors = self.category_factors(fixture.competition)
+            probabilities = [
+                result_probabilities[result_id] * factor
+                for result_id, factor in factors
+            ]
+            rows.append(prediction.ProbabilityVector(probabilities))
+        return rows
+
+    def prepare(self, date):
+        for region in list(self.memory):
+            self.valid_caches.discard(region)
+            self.full_updates.add(region)
+            self.update_cache(region, date, False)
+        # The strengths are only kept as warm starts, as predictions still
+        # solve for their own dates.  Those solves start further from the
+        # solution than usual, so they aren't capped early either.
+        self.valid_caches.clear()
+        self.full_updates.update(self.memory)
+        for competition in list(self.category_counts):
+            self.category_factors(competition)
+
+    def category_factors(self, competition):
+        """Return the category probabilities within their results.
+
+        They're returned as (result ID, factor) pairs, indexed by category ID,
+        and cached until the counts change."""
+
+        if competition in self.factor_caches:
+            return self.factor_caches[competition]
+
+        counts = self.category_counts[competition]
+        adjusted_counts = [
+            max(counts[category_id], 1)
+            for category_id in range(prediction.num_categories())
+        ]
+        result_ids = prediction.result_ids()
+        result_counts = [0] * len(football.RESULTS)
+        for result_id, count in zip(result_ids, adjusted_counts):
+            result_counts[result_id] += count
+        factors = [
+            (result_id, count / result_counts[result_id])
+            for result_id, count in zip(result_ids, adjusted_counts)
+        ]
+
+        self.factor_caches[competition] = factors
+        return factors
+
     def update_cache(self, region, target, verbose):
         """Update the strengths cache for a region."""
 
@@ -68,46 +234,322 @@ class Predictor(base.Predictor):
             return
 
         region_memory = self.memory[region]
+        if region_memory and target - region_memory[0].date > KEEP_MATCHES:
+            region_memory = self.own_memory(region)
         while region_memory and target - region_memory[0].date > KEEP_MATCHES:
             match = region_memory.popleft()
-            category = prediction.category(match)
-            self.category_counts[match.competition][category] -= 1
+            category_id = prediction.category_id(match)
+            self.own_counts(match.competition)[category_id] -= 1
 
         if region in self.strengths_caches:
             strengths = self.strengths_caches[region]
-            iterations = ITERATIONS_UPDATE
+            if region in self.full_updates:
+                max_iterations = self.max_iterations
+            else:
+                max_iterations = self.max_iterations_update
+            kind = 'warm'
         else:
             strengths = collections.defaultdict(float)
-            iterations = ITERATIONS
+            max_iterations = self.max_iterations
+            kind = 'cold'
 
         if verbose:
             print(target, region, file=sys.stderr)
 
-        for _ in iterations:
-            new_strengths = strengths.copy()
-            for match in region_memory:
-                if target < match.date:
-                    print(
-                        f"Target date {target} before match date " f"{match.date}.",
-                        file=sys.stderr,
-                    )
-                goal_diff = match.home_goals - match.away_goals
-                strength_diff = strengths[match.home] - strengths[match.away]
-                change = strength_change(goal_diff, strength_diff)
-                adjustment = devaluation(target - match.date) * change
-                new_strengths[match.home] += adjustment
-                new_strengths[match.away] -= adjustment
-            strengths = new_strengths
+        solve = SOLVERS[self.solver]
+        start_time = time.perf_counter()
+        strengths, iterations, residual, converged = solve(
+            region_memory,
+            strengths,
+            target,
+            max_iterations,
+            self.tolerance,
+            self.parameters,
+        )
+
+        stats = self.solver_stats[region, kind]
+        stats['updates'] += 1
+        stats['iterations'] += iterations
+        stats['seconds'] += time.perf_counter() - start_time
+        stats['residual'] = residual
+        if not converged:
+            stats['capped'] += 1
 
         self.strengths_caches[region] = strengths
         self.valid_caches.add(region)
+        self.full_updates.discard(region)
+
+    def print_diagnostics(self, file=sys.stdout):
+        print(f"## Solver statistics ({self.name}, {self.solver}) ##", file=file)
+        for (region, kind), stats in sorted(self.solver_stats.items()):
+            print(
+                f"{region} ({kind}): {stats['updates']} updates, "
+                f"{stats['iterations']} iterations, {stats['capped']} capped, "
+                f"last residual {stats['residual']:.1e}, {stats['seconds']:.2f} s",
+                file=file,
+            )
+
+
+def solve_loop(
+    matches,
+    strengths,
+    target,
+    max_iterations,
+    tolerance,
+    parameters=DEFAULT_PARAMETERS,
+):
+    """Return the strengths after iterating over the matches.
+
+    Also return the number of iterations, the final residual, i.e. the
+    maximum strength change in the last iteration, and whether the iteration
+    converged.  Stops early once the residual is at most `tolerance`;
+    otherwise it stops at `max_iterations` without converging.
+
+    This is the reference implementation, working on dicts directly."""
+
+    table = devaluation_table(
+        parameters.devaluation_base, parameters.devaluation_exponent
+    )
+    weights = []
+    for match in matches:
+        check_date(match, target)
+        days = (target - match.date).days
+        if 0 <= days < len(table):
+            weights.append(table[days])
+        else:
+            weights.append(day_devaluation(days, parameters))
+
+    iterations = 0
+    residual = math.inf
+    while iterations < max_iterations and residual > tolerance:
+        new_strengths = strengths.copy()
+        for match, weight in zip(matches, weights):
+            goal_diff = match.home_goals - match.away_goals
+            strength_diff = strengths[match.home] - strengths[match.away]
+            change = strength_change(goal_diff, strength_diff, parameters)
+            adjustment = weight * change
+            new_strengths[match.home] += adjustment
+            new_strengths[match.away] -= adjustment
+        residual = max(
+            (abs(new_strengths[team] - strengths[team]) for team in new_strengths),
+            default=0.0,
+        )
+        strengths = new_strengths
+        iterations += 1
+    return strengths, iterations, residual, residual <= tolerance
+
+
+def solve_arrays(
+    matches,
+    strengths,
+    target,
+    max_iterations,
+    tolerance,
+    parameters=DEFAULT_PARAMETERS,
+):
+    """Return the strengths after iterating over the matches.
+
+    Same results as `solve_loop`, but teams are mapped to indices and the
+    per-match values are computed only once, so that every iteration is a
+    scatter-add over flat lists."""
+
+    team_ids, columns = match_columns(matches, target, parameters)
+    values = [strengths[team] for team in team_ids]
+    home_advantage = parameters.home_advantage
+    strength_factor = parameters.strength_factor
+    iterations = 0
+    residual = math.inf
+    while iterations < max_iterations and residual > tolerance:
+        new_values = values.copy()
+        for home, away, goal_term, weight in columns:
+            # Same arithmetic as `strength_change`, inlined.
+            strength_diff = values[home] - values[away]
+            adjustment = weight * (
+                goal_term - strength_factor * (strength_diff + home_advantage)
+            )
+            new_values[home] += adjustment
+            new_values[away] -= adjustment
+        residual = max((abs(x - y) for x, y in zip(new_values, values)), default=0.0)
+        values = new_values
+        iterations += 1
 
+    converged = residual <= tolerance
+    return updated(strengths, team_ids, values), iterations, residual, converged
 
-def strength_change(goal_diff, strength_diff):
+
+def solve_cg(
+    matches,
+    strengths,
+    target,
+    max_iterations,
+    tolerance,
+    parameters=DEFAULT_PARAMETERS,
+):
+    """Return the strengths at the fixed point of the iteration.
+
+    The adjustment summed over a team's matches is linear in the strengths,
+    so the fixed point solves a weighted graph-Laplacian system.  It is solved
+    with conjugate gradients, warm-started from `strengths`.  The Laplacian is
+    singular: every connected group of teams can be shifted by a constant.
+    Conjugate gradients never change the sum of strengths within such a group,
+    which pins the constant where the iteration would have left it, too.
+
+    Return values are the same as for `solve_loop`; a conjugate gradient step
+    counts as one iteration.  It also converges when the residual of the
+    system drops to the rounding error floor."""
+
+    team_ids, columns = match_columns(matches, target, parameters)
+    values = [strengths[team] for team in team_ids]
+    num_teams = len(values)
+    home_advantage = parameters.home_advantage
+    strength_factor = parameters.strength_factor
+
+    edges = []
+    for home, away, goal_term, weight in columns:
+        edges.append((home, away, weight * strength_factor))
+
+    # Residual of the system, i.e. the adjustment one iteration would make.
+    residual = [0.0] * num_teams
+    for home, away, goal_term, weight in columns:
+        strength_diff = values[home] - values[away]
+        adjustment = weight * (
+            goal_term - strength_factor * (strength_diff + home_advantage)
+        )
+        residual[home] += adjustment
+        residual[away] -= adjustment
+
+    direction = residual.copy()
+    residual_norm = dot(residual, residual)
+    # Further down, the residual would be dominated by rounding errors.
+    residual_floor = residual_norm * 1e-28
+    iterations = 0
+    change = math.inf if num_teams else 0.0
+    converged = change <= tolerance
+    while not converged and iterations < max_iterations:
+        product = laplacian_product(edges, direction, num_teams)
+        curvature = dot(direction, product)
+        if curvature <= 0:
+            # The residual vanished, so we are at the fixed point.
+            change = 0.0
+            converged = True
+            break
+        step = residual_norm / curvature
+        for i in range(num_teams):
+            values[i] += step * direction[i]
+            residual[i] -= step * product[i]
+        change = step * max(map(abs, direction))
+        iterations += 1
+        new_residual_norm = dot(residual, residual)
+        converged = change <= tolerance or new_residual_norm <= residual_floor
+        if converged:
+            break
+        ratio = new_residual_norm / residual_norm
+        residual_norm = new_residual_norm
+        for i in range(num_teams):
+            direction[i] = residual[i] + ratio * direction[i]
+
+    return updated(strengths, team_ids, values), iterations, change, converged
+
+
+def match_columns(matches, target, parameters=DEFAULT_PARAMETERS):
+    """Return a mapping from teams to indices, and per-match values.
+
+    The values are tuples of home index, away index, goal term and weight."""
+
+    target_ordinal = target.toordinal()
+    goal_factor = parameters.goal_factor
+    table = devaluation_table(
+        parameters.devaluation_base, parameters.devaluation_exponent
+    )
+    team_ids = {}
+    columns = []
+    for match in matches:
+        check_date(match, target)
+        home = team_ids.setdefault(match.home, len(team_ids))
+        away = team_ids.setdefault(match.away, len(team_ids))
+        goal_term = goal_factor * (match.home_goals - match.away_goals)
+        days = target_ordinal - match.date.toordinal()
+        if 0 <= days < len(table):
+            weight = table[days]
+        else:
+            weight = day_devaluation(days, parameters)
+        columns.append((home, away, goal_term, weight))
+    return team_ids, columns
+
+
+def laplacian_product(edges, vector, size):
+    """Return the product of a weighted graph Laplacian and a vector."""
+    result = [0.0] * size
+    for home, away, weight in edges:
+        flow = weight * (vector[home] - vector[away])
+        result[home] += flow
+        result[away] -= flow
+    return result
+
+
+def dot(first, second):
+    """Return the dot product of two vectors."""
+    return sum(x * y for x, y in zip(first, second))
+
+
+def updated(strengths, team_ids, values):
+    """Return a copy of the strengths with new values for some teams."""
+    result = strengths.copy()
+    result.update(zip(team_ids, values))
+    return result
+
+
+SOLVERS = {'loop': solve_loop, 'arrays': solve_arrays, 'cg': solve_cg}
+
+
+def check_date(match, target):
+    """Warn if a match is from after the target date."""
+    if target < match.date:
+        print(f"Target date {target} before match date {match.date}.", file=sys.stderr)
+
+
+def strength_change(goal_diff, strength_diff, parameters=DEFAULT_PARAMETERS):
     """Return how much stronger the home team was than expected."""
-    return 0.05 * goal_diff - 0.046 * (strength_diff + HOME_ADVANTAGE)
+    return parameters.goal_factor * goal_diff - parameters.strength_factor * (
+        strength_diff + parameters.home_advantage
+    )
 
 
-def devaluation(timedelta):
+def devaluation(timedelta, parameters=DEFAULT_PARAMETERS):
     """Return the relative weight given to a match."""
-    return 0.88 ** timedelta.days ** 0.45
+    return day_devaluation(timedelta.days, parameters)
+
+
+def day_devaluation(days, parameters=DEFAULT_PARAMETERS):
+    """Return the relative weight given to a match that is `days` days old.
+
+    This looks up the table on every call.  Loops over many matches should
+    get `devaluation_table` once and index it, as `match_columns` does."""
+
+    base = parameters.devaluation_base
+    exponent = parameters.devaluation_exponent
+    table = devaluation_table(base, exponent)
+    if 0 <= days < len(table):
+        return table[days]
+    return devaluation_formula(days, base, exponent)
+
+
+@functools.lru_cache()
+def devaluation_table(
+    base=DEFAULT_PARAMETERS.devaluation_base,
+    exponent=DEFAULT_PARAMETERS.devaluation_exponent,
+):
+    """Return a list of weights, indexed by the age of a match in days."""
+    return [
+        devaluation_formula(days, base, exponent)
+        for days in range(KEEP_MATCHES.days + 1)
+    ]
+
+
+def devaluation_formula(
+    days,
+    base=DEFAULT_PARAMETERS.devaluation_base,
+    exponent=DEFAULT_PARAMETERS.devaluation_exponent,
+):
+    """Return the relative weight given to a match that is `days` days old."""
+    return base ** days ** exponent
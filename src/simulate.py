@@ -10,6 +10,7 @@ import sys
 
 import football
 import prediction
+from predictors import snapshots
 
 
 # For Champions League
@@ -19,10 +20,22 @@ BREAK_BETWEEN_STAGES = datetime.timedelta(days=7 * 7)
 BREAK_BETWEEN_LEGS = datetime.timedelta(days=7)
 
 
-def table(matches, fixtures, played, competition, season, predictor):
-    """Return the league table after a simulated season."""
+def fed_predictor(matches, fixtures, get_predictor):
+    """Return a new predictor fed with all matches, ready to be cloned."""
+    predictor = snapshots.fed(get_predictor(), matches)
+    if fixtures:
+        # Fill the predictor's caches once, so that all clones can share them.
+        predictor.predict(fixtures[0])
+    return predictor
+
+
+def table(fixtures, played, competition, season, predictor, category_to_score):
+    """Return the league table after a simulated season.
+
+    The predictor is assumed to have been fed with previous matches."""
+
     simulated = simulate_season(
-        matches, fixtures, played, competition, season, predictor
+        fixtures, played, competition, season, predictor, category_to_score
     )
     season_matches = [*played, *simulated]
     if football.is_cup(competition):
@@ -31,14 +44,19 @@ def table(matches, fixtures, played, competition, season, predictor):
 
 
 def simulate_season(
-    matches, fixtures, played, competition, season, predictor, restrict=False
+    fixtures,
+    played,
+    competition,
+    season,
+    predictor,
+    category_to_score,
+    restrict=False,
 ):
-    """Return the simulated matches after a simulated season."""
+    """Return the simulated matches after a simulated season.
 
-    for match in matches:
-        predictor.feed_match(match)
+    The predictor is assumed to have been fed with previous matches.  It gets
+    fed with the simulated matches, so pass a clone if it's to be reused."""
 
-    category_to_score = get_category_to_score(matches)
     simulated = simulate_fixtures(fixtures, predictor, category_to_score)
     if restrict or not football.is_cup(competition):
         return simulated
@@ -95,9 +113,10 @@ def simulate_fixtures(fixtures, predictor, category_to_score):
     simulated = []
     groups = itertools.groupby(fixtures, key=operator.attrgetter('date'))
     for _, todays_fixtures in groups:
+        todays_fixtures = list(todays_fixtures)
         todays_matches = []
-        for fixture in todays_fixtures:
-            probabilities = predictor.predict(fixture)
+        predictions = predictor.predict_many(todays_fixtures)
+        for fixture, probabilities in zip(todays_fixtures, predictions):
             score = sample_score(probabilities, category_to_score)
             match = football.Match(
                 fixture.competition,
@@ -110,8 +129,7 @@ def simulate_fixtures(fixtures, predictor, category_to_score):
                 stage=fixture.stage,
             )
             todays_matches.append(match)
-        for match in todays_matches:
-            predictor.feed_match(match)
+        predictor.feed_matches(todays_matches)
         simulated.extend(todays_matches)
     return simulated
 
@@ -223,14 +241,13 @@ def get_category_to_score(matches):
 
     counters = collections.defaultdict(collections.Counter)
     for match in matches:
-        score = match.score
-        category = prediction.category_from_score(score)
-        counters[category][score] += 1
+        counters[prediction.category_id(match)][match.score] += 1
 
+    categories = prediction.categories()
     category_to_score = {}
-    for category, counter in counters.items():
+    for category_id, counter in counters.items():
         total = sum(counter.values())
-        category_to_score[category] = {
+        category_to_score[categories[category_id]] = {
             score: count / total for score, count in counter.items()
         }
 
@@ -238,8 +255,9 @@ def get_category_to_score(matches):
 
 
 def sample_score(probabilities, category_to_score):
-    """Return a randomly sampled score."""
-    category = random.choices(list(probabilities), probabilities.values())[0]
+    """Return a randomly sampled score, given a probability vector."""
+    weights = probabilities.probabilities
+    category = random.choices(prediction.categories(), weights)[0]
     scores = category_to_score[category]
     return random.choices(list(scores), scores.values())[0]
 
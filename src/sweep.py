@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+
+"""Script to tune the parameters of the strength model on historical data.
+
+Each parameter is given as name=values, where values is a comma-separated
+list, or a range low:high for random search.  Every evaluated point is stored
+in the results file right away, ranked by mean points, and is skipped when
+the sweep is run again.  Results are only resumed if they're for the same
+match data and solver settings.
+
+This script requires Python 3.6 or higher."""
+
+
+import argparse
+import csv
+import hashlib
+import itertools
+import multiprocessing
+import os
+import pathlib
+import random
+import sys
+
+import data
+import datetools
+import evaluate
+import paths
+from predictors import snapshots, strengths
+
+
+METRICS = ['predictions', 'mean_points', 'standard_error', 'category', 'result']
+
+FIELDS = ['fingerprint', 'prediction_start', *strengths.Parameters._fields, *METRICS]
+
+
+def sweep(points, prediction_start, output_path, jobs=None):
+    """Evaluate the points that aren't in the results file yet.
+
+    Keep the results file ranked and up to date after every point.  Return
+    None if the results file has results for other data or solver settings."""
+
+    matches = data.matches()
+    fingerprint = results_fingerprint(matches)
+    results = load_results(output_path)
+    num_stale = sum(row.get('fingerprint') != fingerprint for row in results.values())
+    if num_stale:
+        print(
+            f"Couldn't resume from {output_path}: {num_stale} results are for "
+            "other match data or solver settings.",
+            file=sys.stderr,
+        )
+        return None
+
+    start_str = str(prediction_start)
+    todo = [
+        point
+        for point in points
+        if (fingerprint, start_str, *map(repr, point)) not in results
+    ]
+    num_skipped = len(points) - len(todo)
+    if num_skipped:
+        print(f"Skipping {num_skipped} points evaluated before.", flush=True)
+
+    if todo:
+        # Worker processes get the matches when they start, instead of each
+        # loading them again.
+        arguments = [(point, prediction_start) for point in todo]
+        with multiprocessing.Pool(jobs, evaluate.init_worker, (matches,)) as pool:
+            iterator = pool.imap_unordered(evaluate_point, arguments)
+            for number, (point, metrics) in enumerate(iterator, 1):
+                row = dict(zip(FIELDS, (fingerprint, start_str, *map(repr, point))))
+                row.update(metrics)
+                results[key(row)] = row
+                save_results(output_path, results)
+                print(
+                    f"[{number}/{len(todo)}] {point_to_str(point)}: "
+                    f"mean points {metrics['mean_points']}",
+                    flush=True,
+                )
+
+    rows = ranked(results.values())
+    return [row for row in rows if row['prediction_start'] == start_str]
+
+
+def results_fingerprint(matches):
+    """Return a digest of the match data and solver settings.
+
+    Results with another digest are outdated."""
+
+    fingerprint = hashlib.sha256()
+    settings = (
+        strengths.DEFAULT_SOLVER,
+        strengths.TOLERANCE,
+        strengths.MAX_ITERATIONS,
+        strengths.MAX_ITERATIONS_UPDATE,
+        strengths.KEEP_MATCHES.days,
+    )
+    fingerprint.update(f'{settings}\n'.encode())
+    snapshots.update_fingerprint(fingerprint, matches, 0, len(matches))
+    return fingerprint.hexdigest()[:16]
+
+
+def evaluate_point(arguments):
+    """Evaluate the strength model with some parameters in a worker process.
+
+    Return the parameters and a dict of metrics."""
+
+    parameters, prediction_start = arguments
+    predictor = strengths.Predictor(parameters=parameters)
+    (evaluation,) = evaluate.evaluate(
+        [predictor], evaluate.worker_matches, prediction_start
+    )
+    tally = evaluation.total()
+    num_predictions = tally.scores.count
+    metrics = {
+        'predictions': num_predictions,
+        'mean_points': f'{tally.mean_points():.6f}',
+        'standard_error': f'{tally.points_standard_error():.6f}',
+        'category': f'{tally.categories.correct() / num_predictions:.6f}',
+        'result': f'{tally.results.correct() / num_predictions:.6f}',
+    }
+    return parameters, metrics
+
+
+def grid_points(values_by_name):
+    """Return all combinations of parameter values."""
+    names = list(values_by_name)
+    return [
+        strengths.DEFAULT_PARAMETERS._replace(**dict(zip(names, values)))
+        for values in itertools.product(*values_by_name.values())
+    ]
+
+
+def random_points(values_by_name, count, seed=None):
+    """Return random combinations of parameter values.
+
+    Values are either lists to choose from, or (low, high) ranges."""
+
+    rng = random.Random(seed)
+    result = []
+    for _ in range(count):
+        replacements = {}
+        for name, values in values_by_name.items():
+            if isinstance(values, tuple):
+                replacements[name] = round(rng.uniform(*values), 4)
+            else:
+                replacements[name] = rng.choice(values)
+        result.append(strengths.DEFAULT_PARAMETERS._replace(**replacements))
+    return result
+
+
+def parse_parameter(argument):
+    """Return a parameter name and its values, given a command line argument.
+
+    Raise a ValueError for invalid arguments."""
+
+    name, separator, values_str = argument.partition('=')
+    if not separator or name not in strengths.Parameters._fields:
+        raise ValueError(f"not a parameter assignment: {argument!r}")
+    if ':' in values_str:
+        low, high = values_str.split(':')
+        return name, (float(low), float(high))
+    return name, [float(value) for value in values_str.split(',')]
+
+
+def load_results(path):
+    """Return the stored results, keyed by prediction start and parameters."""
+
+    try:
+        file = open(path, encoding='utf-8', newline='')
+    except FileNotFoundError:
+        return {}
+    except OSError as exc:
+        print("Couldn't open results file:", exc, file=sys.stderr)
+        return {}
+
+    with file:
+        return {key(row): row for row in csv.DictReader(file)}
+
+
+def save_results(path, results):
+    """Store the results, ranked by mean points.
+
+    The file is replaced in one go, so an interrupted sweep leaves it intact."""
+
+    temporary_path = path.with_name(path.name + '.tmp')
+    try:
+        path.parent.mkdir(exist_ok=True)
+        file = open(temporary_path, 'w', encoding='utf-8', newline='')
+    except OSError as exc:
+        print("Couldn't open results file to write to:", exc, file=sys.stderr)
+        return
+
+    with file:
+        writer = csv.DictWriter(file, FIELDS)
+        writer.writeheader()
+        writer.writerows(ranked(results.values()))
+
+    try:
+        os.replace(temporary_path, path)
+    except OSError as exc:
+        print("Couldn't replace results file:", exc, file=sys.stderr)
+
+
+def key(row):
+    """Return the key of a results row."""
+    return tuple(row.get(name) for name in FIELDS[: -len(METRICS)])
+
+
+def ranked(rows):
+    """Return results rows, best first."""
+    return sorted(rows, key=lambda row: float(row['mean_points']), reverse=True)
+
+
+def point_to_str(point):
+    """Return a short description of the parameters that differ from defaults."""
+    differences = [
+        f'{name}={value}'
+        for name, value, default in zip(
+            point._fields, point, strengths.DEFAULT_PARAMETERS
+        )
+        if value != default
+    ]
+    return ', '.join(differences) or 'defaults'
+
+
+def print_ranking(rows, count):
+    """Print the best results."""
+    print()
+    print('# Best parameters #')
+    for row in rows[:count]:
+        point = strengths.Parameters(
+            *(float(row[name]) for name in strengths.Parameters._fields)
+        )
+        print(
+            f"{row['mean_points']} +/- {row['standard_error']} "
+            f"({float(row['result']):.2%} results): {point_to_str(point)}"
+        )
+
+
+def parse_args():
+    """Return the parsed command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Tune the parameters of the strength model."
+    )
+    parser.add_argument(
+        'parameters',
+        nargs='*',
+        metavar='NAME=VALUES',
+        help=(
+            "comma-separated values or a low:high range, for one of: "
+            + ', '.join(strengths.Parameters._fields)
+        ),
+    )
+    parser.add_argument(
+        '--random',
+        type=evaluate.positive_int,
+        metavar='COUNT',
+        help="evaluate COUNT random points instead of the whole grid",
+    )
+    parser.add_argument('--seed', type=int, help="seed for the random points")
+    parser.add_argument(
+        '-j',
+        '--jobs',
+        type=evaluate.positive_int,
+        default=1,
+        help="number of worker processes (default: 1)",
+    )
+    parser.add_argument(
+        '--start',
+        type=datetools.date_from_iso,
+        default=evaluate.PREDICTION_START,
+        metavar='DATE',
+        help=f"first date to evaluate (default: {evaluate.PREDICTION_START})",
+    )
+    parser.add_argument(
+        '--output',
+        type=pathlib.Path,
+        default=paths.SWEEP_PATH,
+        metavar='PATH',
+        help="results file, also used to resume (default: data/sweep.csv)",
+    )
+    parser.add_argument(
+        '--top',
+        type=evaluate.positive_int,
+        default=10,
+        help="number of best results to print (default: 10)",
+    )
+    args = parser.parse_args()
+
+    args.values_by_name = {}
+    for argument in args.parameters:
+        try:
+            name, values = parse_parameter(argument)
+        except ValueError as exc:
+            parser.error(str(exc))
+        if args.random is None and isinstance(values, tuple):
+            parser.error(f"ranges need --random: {argument!r}")
+        args.values_by_name[name] = values
+    return args
+
+
+def main():
+    """Run a parameter sweep."""
+    args = parse_args()
+    if args.random is None:
+        points = grid_points(args.values_by_name)
+    else:
+        points = random_points(args.values_by_name, args.random, args.seed)
+    # Random points may repeat.
+    points = list(dict.fromkeys(points))
+    rows = sweep(points, args.start, args.output, args.jobs)
+    if rows is None:
+        exit(1)
+    print_ranking(rows, args.top)
+
+
+if __name__ == '__main__':
+    main()